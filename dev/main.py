@@ -1,20 +1,26 @@
 """
 🎬 Pro Video Merger
 A modern desktop GUI application for merging multiple video files with smart splitting
-Built with PyQt5 and MoviePy
+Built with PyQt5 and FFmpeg
 """
 
 import sys
 import os
-import time
+import json
+import functools
+import io
+import traceback
+from itertools import accumulate
+import tempfile
 from typing import List, Optional
 from PyQt5.QtGui import QFont, QIcon, QColor, QPalette, QLinearGradient, QBrush
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
                            QWidget, QLabel, QPushButton, QListWidget, QProgressBar,
                            QFileDialog, QMessageBox, QCheckBox, QSpinBox, QFrame,
-                           QListWidgetItem, QAbstractItemView, QSizePolicy, QScrollArea,
-                           QLineEdit, QDialog)
-from PyQt5.QtCore import Qt, QTimer, QSize
+                           QListWidgetItem, QAbstractItemView, QSizePolicy,
+                           QLineEdit, QDialog, QTextBrowser)
+from PyQt5.QtCore import Qt, QTimer, QSize, QThreadPool, QStandardPaths, QUrl, QElapsedTimer, QSettings
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 import ctypes
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -31,11 +37,17 @@ try:
 except:
     pass
 
-from video_merger_robust import RobustVideoMerger
-from worker_thread import VideoMergerWorker, VideoInfoWorker, UpdateCheckerWorker
+from video_merger_robust import RobustVideoMerger, MetadataCache
+from worker_thread import VideoMergerWorker, VideoInfoWorker, BatchPlanJob, sanitize_title, clear_batch_cache
 
 CURRENT_VERSION = "2.3.0"
 UPDATE_URL = "https://raw.githubusercontent.com/YourUsername/VideoMerger/main/version.json" # Placeholder
+UPDATE_MANIFEST_KEYS = ("version", "download_url", "message")
+
+@functools.lru_cache(maxsize=32)
+def _sanitize_title(title: str, fallback: str = "merged_video") -> str:
+    """File-name-safe version of a compilation title (cached - the preview asks on every refresh)"""
+    return sanitize_title(title) or fallback
 
 class ProjectTitleDialog(QDialog):
     """Custom professional dialog for title input"""
@@ -105,6 +117,117 @@ class ModernDarkPalette(QPalette):
         self.setColor(QPalette.Highlight, QColor(42, 130, 218))
         self.setColor(QPalette.HighlightedText, QColor(0, 0, 0))
 
+_DARK_PALETTE = None
+
+def dark_palette():
+    """Shared ModernDarkPalette (built on first use - QPalette needs the QApplication to exist)"""
+    global _DARK_PALETTE
+    if _DARK_PALETTE is None:
+        _DARK_PALETTE = ModernDarkPalette()
+    return _DARK_PALETTE
+
+# Stylesheets are constant, so they are built once at import rather than per apply_styling call
+_MAIN_QSS = """
+    QMainWindow { background-color: #1e1e1e; font-family: 'Segoe UI', sans-serif; }
+    QListWidget {
+        background-color: #252526;
+        border: 1px solid #3e3e42;
+        border-radius: 5px;
+        color: #ddd;
+        font-size: 14px;
+        outline: none;
+    }
+    QListWidget::item { padding: 10px; border-bottom: 1px solid #303030; }
+    QListWidget::item:selected { background-color: #094771; }
+    QListWidget::item:hover { background-color: #2a2d2e; }
+    
+    QPushButton {
+        background-color: #3e3e42;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        font-weight: 600;
+        font-size: 14px;
+    }
+    QPushButton:hover { background-color: #4e4e52; }
+    QPushButton:pressed { background-color: #2d2d30; }
+    
+    QPushButton#add_btn {
+        border: 2px dashed #444;
+        background-color: #2a2a2e;
+        color: #888;
+        font-size: 20px;
+        font-weight: bold;
+        padding: 20px;
+    }
+    QPushButton#add_btn:hover {
+        border-color: #0078d4;
+        color: #0078d4;
+        background-color: #1a1a1f;
+    }
+    
+    QPushButton:disabled {
+        background-color: #333;
+        color: #555;
+    }
+"""
+
+_MERGE_BTN_QSS = """
+    QPushButton {
+        background-color: #0078d4;
+        color: white;
+        font-size: 18px;
+        border-radius: 6px;
+    }
+    QPushButton:hover { background-color: #106ebe; }
+    QPushButton:pressed { background-color: #005a9e; }
+    QPushButton:disabled { background-color: #2d2d30; color: #555; }
+"""
+
+# Preview HTML shells - static markup is built once, only the dynamic fields are formatted in
+_SUMMARY_HTML = """
+    <div style='background-color: #252526; border: 1px solid #3e3e42; border-radius: 8px; padding: 12px; margin-bottom: 20px;'>
+        <div style='color: #0078d4; font-weight: bold; font-size: 15px;'>Project Summary</div>
+        <div style='color: #aaa; font-size: 12px; margin-top: 5px;'>
+            📦 Total: {total_clips} clips<br>
+            🎞 Parts: {total_parts} batches<br>
+            ⏱ Split: {split_mode_str}<br>
+            📂 Folder: <span style='color: #0078d4;'>{output_folder}</span>
+        </div>
+    </div>
+    <div style='margin-bottom: 15px; color: #ffffff; font-size: 14px;'><b>Merge Execution Plan:</b></div>
+""".format
+_CARD_HEAD_HTML = """
+    <div id='batch_{index}' style='background-color: #1e1e20; border: 1px solid #333; border-radius: 8px; padding: 12px; margin-bottom: 15px; border-left: 5px solid {bar_color};'>
+        <div style='display: flex; justify-content: space-between;'>
+            <span style='color: {bar_color}; font-weight: bold; font-size: 14px;'>PART {part_number}</span>
+            <span style='background: #333; color: #aaa; padding: 2px 6px; border-radius: 4px; font-size: 10px; font-weight: bold;'>{duration}</span>
+        </div>
+        
+        <div style='margin-top: 8px; background-color: #111; height: 4px; border-radius: 2px;'>
+            <div style='background-color: {bar_color}; width: {usage_percent}%; height: 100%; border-radius: 2px;'></div>
+        </div>
+
+        <div style='color: #eee; font-size: 11px; margin-top: 8px; font-family: monospace;'>{filename}</div>
+        
+        <div style='margin-top: 10px; border-top: 1px solid #2a2a2a; padding-top: 8px;'>
+""".format
+_ROW_HTML = """
+        <div style='color: #888; font-size: 10px; margin-bottom: 3px; display: flex; justify-content: space-between;'>
+            <span style='color: #0078d4;'>•</span> <span style='flex-grow: 1; margin-left: 5px;'>{fname}</span>
+            <span style='color: #444;'>[{duration}]</span>
+        </div>
+""".format
+_MORE_ROWS_HTML = "<div style='color: #555; padding-left: 10px; font-size: 10px;'>... and {} more clips</div>".format
+_CARD_TAIL_HTML = "</div></div>"
+
+def _display_entry(name, dur_str=None):
+    """(file name, name truncated for preview cards, "m:ss" or None) - formatted once per file"""
+    return (name, name[:32] + "..." if len(name) > 35 else name, dur_str)
+
+# Alternating list backgrounds that subtly color code parts
+_ROW_BG = (QColor("#1e1e20"), QColor("#252526"))
+
 class VideoMergerApp(QMainWindow):
     """
     Main application window for the Video Merger tool
@@ -116,8 +239,17 @@ class VideoMergerApp(QMainWindow):
         
         # Initialize video processing components
         self.video_files = []
+        self._video_files_set = set()  # Mirrors video_files for O(1) duplicate checks
+        self._item_by_path = {}  # Map path -> QListWidgetItem
+        self._display_cache = {}  # Map path -> _display_entry tuple for list/preview rows
+        self._file_index = {}  # Map path -> 1-based position, rebuilt from each preview snapshot
+        self._total_duration_sec = 0.0  # Running sum of video_durations
+        self._pending_info_count = 0  # Files still waiting on a metadata probe
         self.video_durations = {}  # Map path -> duration in seconds
         self.video_merger = RobustVideoMerger()
+        # Persistent probe cache (keyed by path, mtime and size), so reopened clips skip probing
+        self._meta_cache = self._open_metadata_cache()
+        self.video_merger.metadata_cache = self._meta_cache
         self.worker_thread = None
         # Adaptive performance detection for low-end hardware
         try:
@@ -154,9 +286,9 @@ class VideoMergerApp(QMainWindow):
                 f.write(f"Startup RAM Check Fail: {e}\n")
         
         self.worker_thread = None
-        self.info_worker = None
-        self.update_worker = None
-        self.start_time = None
+        self._info_workers = set() # Running probes, kept alive until their pool tasks finish
+        self._elapsed = QElapsedTimer()  # Monotonic merge clock (invalid until a merge starts)
+        self._elapsed_shown = None  # Last whole second written to the label
         self.is_calculating_info = False
         # Loading animation components
         self.anim_step = 0
@@ -167,6 +299,25 @@ class VideoMergerApp(QMainWindow):
         self.progress_timer = QTimer()
         self.progress_timer.timeout.connect(self.update_time_display)
         
+        # Coalesce bursts of changes (typing, spinbox ticks, probe results) into one preview rebuild
+        self._preview_debounce = QTimer()
+        self._preview_debounce.setSingleShot(True)
+        self._preview_debounce.setInterval(150)
+        self._preview_debounce.timeout.connect(self.update_split_preview)
+        
+        # Batch planning for the preview and metadata probes run on the shared thread pool
+        self._preview_pool = QThreadPool.globalInstance()
+        self._preview_pool.setMaxThreadCount(max(4, os.cpu_count() or 1))
+        self._preview_generation = 0  # Bumped per request; stale plans are dropped
+        self._preview_request = None
+        self._preview_job = None
+        
+        # Inputs of the last rendered preview, used to skip identical rebuilds
+        self._preview_cache_key = None
+        self._files_version = 0  # Bumped whenever video_files or video_durations change
+        self._preview_html = None  # Document currently in preview_view
+        self._preview_loading = False  # True while the "Analyzing Clips" overlay is shown
+        
         self.init_ui()
         self.apply_styling()
         
@@ -174,6 +325,7 @@ class VideoMergerApp(QMainWindow):
         self.setAcceptDrops(True)
         
         # Check for updates on startup
+        self._nam = None # Created on the first check, then reused so later checks keep its connection
         self.check_for_updates()
     
     def dragEnterEvent(self, event):
@@ -225,17 +377,15 @@ class VideoMergerApp(QMainWindow):
         preview_header.setStyleSheet("color: #0078d4; font-weight: bold; font-size: 14px; margin-bottom: 5px;")
         left_layout.addWidget(preview_header)
 
-        self.preview_scroll = QScrollArea()
-        self.preview_scroll.setWidgetResizable(True)
-        self.preview_scroll.setStyleSheet("border: 1px solid #333; border-radius: 8px; background-color: #1a1a1c;")
-        
-        self.preview_label = QLabel("<div style='color: #444; text-align: center; margin-top: 150px;'>Merge plan will appear here...</div>")
-        self.preview_label.setWordWrap(True)
-        self.preview_label.setAlignment(Qt.AlignTop)
+        # QTextBrowser scrolls on its own and keeps its document between updates
+        self.preview_view = QTextBrowser()
+        self.preview_view.setOpenLinks(False)
+        self.preview_view.setStyleSheet("border: 1px solid #333; border-radius: 8px; background-color: #1a1a1c;")
+        self.preview_view.setHtml("<div style='color: #444; text-align: center; margin-top: 150px;'>Merge plan will appear here...</div>")
+        self._batch_html_cache = {}  # (part, filename, files, durations) -> rendered card
         
-        self.preview_scroll.setWidget(self.preview_label)
-        left_layout.addWidget(self.preview_scroll)
-        left_layout.setStretchFactor(self.preview_scroll, 1) # Large stretch factor
+        left_layout.addWidget(self.preview_view)
+        left_layout.setStretchFactor(self.preview_view, 1) # Large stretch factor
         
         left_layout.addSpacing(20)
         
@@ -250,7 +400,7 @@ class VideoMergerApp(QMainWindow):
         self.smart_split_cb.setChecked(True)
         self.smart_split_cb.setStyleSheet("font-weight: bold; color: #555; font-size: 11px;")
         self.smart_split_cb.toggled.connect(self.toggle_split_options)
-        self.smart_split_cb.toggled.connect(self.update_split_preview)
+        self.smart_split_cb.toggled.connect(self.schedule_preview_update)
         controls_layout.addWidget(self.smart_split_cb)
 
         # Config Row
@@ -262,7 +412,7 @@ class VideoMergerApp(QMainWindow):
         self.duration_spin.setValue(10)
         self.duration_spin.setSuffix("m")
         self.duration_spin.setFixedWidth(60)
-        self.duration_spin.valueChanged.connect(self.update_split_preview)
+        self.duration_spin.valueChanged.connect(self.schedule_preview_update)
         
         self.count_spin = QSpinBox()
         self.count_spin.setRange(1, 1000)
@@ -270,7 +420,7 @@ class VideoMergerApp(QMainWindow):
         self.count_spin.setSuffix("c")
         self.count_spin.setFixedWidth(60)
         self.count_spin.setVisible(False)
-        self.count_spin.valueChanged.connect(self.update_split_preview)
+        self.count_spin.valueChanged.connect(self.schedule_preview_update)
 
         self.split_duration_btn = QPushButton("T")
         self.split_duration_btn.setToolTip("Split by Duration")
@@ -293,20 +443,36 @@ class VideoMergerApp(QMainWindow):
         self.auto_naming_cb = QCheckBox("Name")
         self.auto_naming_cb.setChecked(True)
         self.auto_naming_cb.setStyleSheet("color: #666; font-size: 10px;")
-        self.auto_naming_cb.toggled.connect(self.update_split_preview)
+        self.auto_naming_cb.toggled.connect(self.schedule_preview_update)
         
         self.auto_save_cb = QCheckBox("Save")
         self.auto_save_cb.setChecked(True)
         self.auto_save_cb.setStyleSheet("color: #666; font-size: 10px;")
+        self.auto_save_cb.toggled.connect(self.schedule_preview_update)
         
         self.standalone_cb = QCheckBox("Auto-Standalone (60s)")
         self.standalone_cb.setChecked(True)
         self.standalone_cb.setStyleSheet("color: #0078d4; font-size: 10px; font-weight: bold;")
-        self.standalone_cb.toggled.connect(self.update_split_preview)
+        self.standalone_cb.toggled.connect(self.schedule_preview_update)
+        
+        self.recompress_cb = QCheckBox("Compress")
+        self.recompress_cb.setToolTip("Re-encode the joined output for a smaller file (slower)")
+        self.recompress_cb.setStyleSheet("color: #666; font-size: 10px;")
+        
+        self.parallel_cb = QCheckBox("Parallel")
+        self.parallel_cb.setToolTip("Merge several output parts at the same time (uses more CPU and RAM)")
+        self.parallel_cb.setStyleSheet("color: #666; font-size: 10px;")
+        
+        self.background_cb = QCheckBox("Background")
+        self.background_cb.setToolTip("Run FFmpeg at lower CPU priority so the PC stays responsive (merges take a little longer)")
+        self.background_cb.setStyleSheet("color: #666; font-size: 10px;")
         
         config_row.addWidget(self.auto_naming_cb)
         config_row.addWidget(self.auto_save_cb)
         config_row.addWidget(self.standalone_cb)
+        config_row.addWidget(self.recompress_cb)
+        config_row.addWidget(self.parallel_cb)
+        config_row.addWidget(self.background_cb)
         config_row.addStretch()
         controls_layout.addLayout(config_row)
 
@@ -355,6 +521,15 @@ class VideoMergerApp(QMainWindow):
         
         list_header.addSpacing(10)
 
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.setToolTip("Forget cached video info and read every file again")
+        self.refresh_btn.setCursor(Qt.PointingHandCursor)
+        self.refresh_btn.setFixedWidth(100)
+        self.refresh_btn.clicked.connect(self.refresh_metadata)
+        list_header.addWidget(self.refresh_btn)
+        
+        list_header.addSpacing(10)
+
         self.clear_btn = QPushButton("Clear All")
         self.clear_btn.setCursor(Qt.PointingHandCursor)
         self.clear_btn.setFixedWidth(100)
@@ -437,7 +612,7 @@ class VideoMergerApp(QMainWindow):
                 background-color: #222;
             }
         """)
-        self.comp_title_edit.textChanged.connect(self.update_split_preview)
+        self.comp_title_edit.textChanged.connect(self.schedule_preview_update)
         title_border_layout.addWidget(self.comp_title_edit)
         right_layout.addWidget(self.title_border)
         
@@ -455,65 +630,12 @@ class VideoMergerApp(QMainWindow):
         """Apply global stylesheet"""
         # Set dark palette for standard widgets not covered by sheets
         QApplication.setStyle("Fusion")
-        QApplication.setPalette(ModernDarkPalette())
+        QApplication.setPalette(dark_palette())
         
-        self.setStyleSheet("""
-            QMainWindow { background-color: #1e1e1e; font-family: 'Segoe UI', sans-serif; }
-            QListWidget {
-                background-color: #252526;
-                border: 1px solid #3e3e42;
-                border-radius: 5px;
-                color: #ddd;
-                font-size: 14px;
-                outline: none;
-            }
-            QListWidget::item { padding: 10px; border-bottom: 1px solid #303030; }
-            QListWidget::item:selected { background-color: #094771; }
-            QListWidget::item:hover { background-color: #2a2d2e; }
-            
-            QPushButton {
-                background-color: #3e3e42;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                font-weight: 600;
-                font-size: 14px;
-            }
-            QPushButton:hover { background-color: #4e4e52; }
-            QPushButton:pressed { background-color: #2d2d30; }
-            
-            QPushButton#add_btn {
-                border: 2px dashed #444;
-                background-color: #2a2a2e;
-                color: #888;
-                font-size: 20px;
-                font-weight: bold;
-                padding: 20px;
-            }
-            QPushButton#add_btn:hover {
-                border-color: #0078d4;
-                color: #0078d4;
-                background-color: #1a1a1f;
-            }
-            
-            QPushButton:disabled {
-                background-color: #333;
-                color: #555;
-            }
-        """)
+        self.setStyleSheet(_MAIN_QSS)
         
         # Primary Action Button Style
-        self.merge_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #0078d4;
-                color: white;
-                font-size: 18px;
-                border-radius: 6px;
-            }
-            QPushButton:hover { background-color: #106ebe; }
-            QPushButton:pressed { background-color: #005a9e; }
-            QPushButton:disabled { background-color: #2d2d30; color: #555; }
-        """)
+        self.merge_btn.setStyleSheet(_MERGE_BTN_QSS)
         self.merge_btn.setObjectName("merge_btn")
         self.add_btn.setObjectName("add_btn")
 
@@ -527,7 +649,7 @@ class VideoMergerApp(QMainWindow):
         self.auto_naming_cb.setVisible(isVisible)
         self.auto_save_cb.setVisible(isVisible)
         self.standalone_cb.setVisible(isVisible)
-        self.preview_scroll.setVisible(isVisible)
+        self.preview_view.setVisible(isVisible)
         if isVisible:
             mode = "duration" if self.split_duration_btn.isChecked() else "count"
             self.set_split_mode(mode)
@@ -545,7 +667,7 @@ class VideoMergerApp(QMainWindow):
             self.duration_spin.setVisible(False)
             self.count_spin.setVisible(True)
         
-        self.update_split_preview()
+        self.schedule_preview_update()
 
     def add_videos(self):
         """Add video files to the list via dialog"""
@@ -560,58 +682,128 @@ class VideoMergerApp(QMainWindow):
     def handle_files_addition(self, files: List[str]):
         """Shared logic for adding files from any source (dialog or drop)"""
         new_files = []
+        new_items = []
         for f in files:
-            if f not in self.video_files:
+            if f not in self._video_files_set:
                 self.video_files.append(f)
-                new_files.append(f)
-                item = QListWidgetItem(os.path.basename(f))
+                self._files_version += 1
+                self._video_files_set.add(f)
+                bn = os.path.basename(f)
+                self._display_cache[f] = _display_entry(bn)
+                # Cached files resolve on the worker's first emit, before any probe starts
+                item = QListWidgetItem(f"{bn} (Calculating...)")
                 item.setData(Qt.UserRole, f) # Store full path
-                item.setText(f"{os.path.basename(f)} (Calculating...)")
-                self.file_list.addItem(item)
+                new_files.append(f)
+                new_items.append(item)
+                self._item_by_path[f] = item
+        
+        if new_items:
+            # Insert everything with painting/signals off so the list lays out once, not per file
+            self.file_list.setUpdatesEnabled(False)
+            self.file_list.blockSignals(True)
+            try:
+                for item in new_items:
+                    self.file_list.addItem(item)
+            finally:
+                self.file_list.blockSignals(False)
+                self.file_list.setUpdatesEnabled(True)
+            self.file_list.scrollToBottom()
         
         if new_files:
+            clear_batch_cache()
+            self._pending_info_count += len(new_files)
             self.is_calculating_info = True
             self.anim_timer.start(500)
             self.fetch_metadata(new_files)
             
         self.update_ui_state()
 
+    def _open_metadata_cache(self):
+        """Open the probe cache in the per-user app data folder (temp dir as a fallback)"""
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation) or tempfile.gettempdir()
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            return MetadataCache(os.path.join(cache_dir, "metadata.sqlite3"))
+        except Exception as e:
+            print(f"Metadata cache unavailable: {e}")
+            return None
+
+    def refresh_metadata(self):
+        """Forget remembered metadata and probe the current list again"""
+        try:
+            self.video_merger.clear_info_cache()
+        except Exception as e:
+            print(f"Could not clear metadata cache: {e}")
+        clear_batch_cache() # Plans were built from the old durations
+        if not self.video_files:
+            return
+        for path, item in self._item_by_path.items():
+            item.setText(f"{self._display_cache[path][0]} (Calculating...)")
+        self._pending_info_count += len(self.video_files)
+        self.is_calculating_info = True
+        self.anim_timer.start(500)
+        self.fetch_metadata(list(self.video_files))
+        self.update_ui_state()
+
     def fetch_metadata(self, files):
         """Start worker to fetch duration for new files"""
-        self.info_worker = VideoInfoWorker(files, self.video_merger)
-        self.info_worker.info_ready.connect(self.update_file_info)
-        self.info_worker.info_failed.connect(self.handle_info_failed)
-        self.info_worker.start()
+        worker = VideoInfoWorker(files, self.video_merger, self._preview_pool)
+        worker.infos_ready.connect(self.update_file_infos)
+        worker.finished.connect(lambda: self._info_workers.discard(worker))
+        self._info_workers.add(worker)
+        worker.start()
+
+    def update_file_infos(self, infos, errors):
+        """Apply a chunk of probe results, then refresh totals and state once"""
+        applied = 0
+        for path, info in infos.items():
+            if path in self._video_files_set: # Skip files cleared while the probe was running
+                self.update_file_info(path, info)
+                applied += 1
+        for path, error in errors.items():
+            if path in self._video_files_set:
+                self.handle_info_failed(path, error)
+                applied += 1
+            else:
+                print(f"Failed to get info for {path}: {error}")
+        if applied:
+            self.update_file_info_post(applied)
 
     def handle_info_failed(self, path, error):
         """Handle cases where video info cannot be fetched"""
         print(f"Failed to get info for {path}: {error}")
-        self.video_durations[path] = 0 # Mark as known but zero duration
-        self.update_file_info_post(path)
+        self.set_video_duration(path, 0) # Mark as known but zero duration
+
+    def set_video_duration(self, path, duration):
+        """Record a file's duration and keep the running total in step"""
+        self._total_duration_sec += duration - self.video_durations.get(path, 0)
+        self.video_durations[path] = duration
+        self._files_version += 1
+        dur_str = f"{int(duration // 60)}:{int(duration % 60):02d}"
+        entry = self._display_cache.get(path)
+        if entry is None:
+            self._display_cache[path] = _display_entry(os.path.basename(path), dur_str)
+        else:
+            self._display_cache[path] = (entry[0], entry[1], dur_str)
 
     def update_file_info(self, path, info):
         """Update list item with actual duration"""
         duration = info.get('duration', 0)
-        self.video_durations[path] = duration
+        self.set_video_duration(path, duration)
         
-        # Find item in list
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            if item.data(Qt.UserRole) == path:
-                minutes = int(duration // 60)
-                seconds = int(duration % 60)
-                item.setText(f"{info['filename']} - {minutes}:{seconds:02d}")
-                break
-        
-        self.update_file_info_post(path)
+        item = self._item_by_path.get(path)
+        if item is not None:
+            fname, _, dur_str = self._display_cache[path]
+            item.setText(f"{fname} - {dur_str}")
 
-    def update_file_info_post(self, path):
+    def update_file_info_post(self, count=1):
         """Common logic after file info is received or failed"""
         # Check if all done
-        if all(f in self.video_durations for f in self.video_files):
+        self._pending_info_count -= count
+        if self._pending_info_count <= 0:
+            self._pending_info_count = 0
             self.is_calculating_info = False
             self.anim_timer.stop()
-            self.update_split_preview()
 
         self.update_total_duration()
         self.update_ui_state()
@@ -623,12 +815,14 @@ class VideoMergerApp(QMainWindow):
         
         if self.is_calculating_info:
             self.update_status(f"Calculating Video Info{dots}")
-            self.update_split_preview()
+            # Only the dots change between ticks - the plan itself is rebuilt when metadata arrives
+            if self._preview_loading:
+                self.set_preview_html(self._render_loading_overlay(dots))
             self.update_ui_state()
 
     def update_total_duration(self):
         """Calculate and display total duration of all selected videos"""
-        total_sec = sum(self.video_durations.get(f, 0) for f in self.video_files)
+        total_sec = self._total_duration_sec
         mins = int(total_sec // 60)
         secs = int(total_sec % 60)
         hours = 0
@@ -640,18 +834,45 @@ class VideoMergerApp(QMainWindow):
             self.total_duration_label.setText(f"Total Duration: {mins}m {secs}s")
             
         # Also update split preview
-        self.update_split_preview()
+        self.schedule_preview_update()
+
+    def schedule_preview_update(self, *_):
+        """
+        Queue a preview rebuild. Calls while one is already pending are absorbed,
+        so a burst of N changes costs one rebuild that reads the latest state.
+        """
+        if self._preview_debounce.isActive():
+            return
+        self._preview_debounce.start()
 
     def update_split_preview(self):
         """Update the text preview of how videos will be split with a high-end visual look"""
         if not self.video_files:
-            self.preview_label.setText("<div style='color: #555; font-size: 13px; text-align: center; margin-top: 50px;'>Add videos to see split preview...</div>")
+            self._preview_generation += 1
+            self._preview_cache_key = None
+            self._preview_loading = False
+            self.set_preview_html("<div style='color: #555; font-size: 13px; text-align: center; margin-top: 50px;'>Add videos to see split preview...</div>")
             return
 
         if not self.smart_split_cb.isChecked():
-            self.preview_label.setText("<div style='color: #0078d4; font-size: 14px; font-weight: bold; text-align: center; margin-top: 50px;'>Smart Split Disabled<br><span style='font-weight: normal; color: #888;'>1 single part will be created</span></div>")
+            self._preview_generation += 1
+            self._preview_cache_key = None
+            self._preview_loading = False
+            self.set_preview_html("<div style='color: #0078d4; font-size: 14px; font-weight: bold; text-align: center; margin-top: 50px;'>Smart Split Disabled<br><span style='font-weight: normal; color: #888;'>1 single part will be created</span></div>")
             return
 
+        # Skip the rebuild entirely when nothing that affects the plan has changed
+        cache_key = (
+            self._files_version,
+            self.split_duration_btn.isChecked(), self.duration_spin.value(), self.count_spin.value(),
+            self.standalone_cb.isChecked(), self.comp_title_edit.text(),
+            self.auto_naming_cb.isChecked(), self.auto_save_cb.isChecked()
+        )
+        if cache_key == self._preview_cache_key:
+            return
+        self._preview_cache_key = cache_key
+        self._preview_generation += 1
+
         max_dur = 0
         max_count = 0
         standalone_thresh = 60 if self.standalone_cb.isChecked() else 0
@@ -661,58 +882,84 @@ class VideoMergerApp(QMainWindow):
         else:
             max_count = self.count_spin.value()
         
-        durations_ready = all(f in self.video_durations for f in self.video_files)
-        batches = self.video_merger.calculate_batches(
-            self.video_files, 
-            max_duration_sec=max_dur, 
-            max_clip_count=max_count,
-            cached_durations=self.video_durations,
-            standalone_threshold_sec=standalone_thresh
-        )
-        
-        if not durations_ready and max_dur > 0:
-            dots = "." * self.anim_step
-            self.preview_label.setText(f"<div style='color: #0078d4; text-align: center; margin-top: 100px; font-size: 16px;'><b>Analyzing Clips{dots}</b><br><span style='color: #666; font-size: 12px;'>Preparing your compilation cards</span></div>")
+        durations_ready = len(self.video_durations) >= len(self.video_files)
+        self._preview_loading = not durations_ready and max_dur > 0
+        if self._preview_loading:
+            self.set_preview_html(self._render_loading_overlay("." * self.anim_step))
             return
 
-        total_clips = len(self.video_files)
+        # Snapshot the inputs and plan the batches off the GUI thread
+        self._preview_request = {
+            'video_files': list(self.video_files),
+            'durations': dict(self.video_durations),
+            'max_dur': max_dur,
+            'split_mode_str': f"Max {self.duration_spin.value()}m" if self.split_duration_btn.isChecked() else f"Max {self.count_spin.value()} clips",
+            'output_folder': "Merge/" if self.auto_save_cb.isChecked() else "Manual",
+            'title': self.comp_title_edit.text(),
+            'auto_naming': self.auto_naming_cb.isChecked(),
+        }
+        job = BatchPlanJob(
+            self._preview_generation, self.video_merger,
+            self._preview_request['video_files'], self._preview_request['durations'],
+            max_dur, max_count, standalone_thresh
+        )
+        job.signals.plan_ready.connect(self.render_split_preview)
+        self._preview_job = job
+        self._preview_pool.start(job)
+
+    def _render_loading_overlay(self, dots):
+        """Placeholder shown while clip durations are still being probed"""
+        return f"<div style='color: #0078d4; text-align: center; margin-top: 100px; font-size: 16px;'><b>Analyzing Clips{dots}</b><br><span style='color: #666; font-size: 12px;'>Preparing your compilation cards</span></div>"
+
+    def render_split_preview(self, generation, batches):
+        """Build the sidebar cards from a finished batch plan (runs on the GUI thread)"""
+        if generation != self._preview_generation:
+            return # Superseded by a newer edit
+        request = self._preview_request
+        video_files = request['video_files']
+        durations = request['durations']
+        max_dur = request['max_dur']
+
+        total_clips = len(video_files)
         total_parts = len(batches)
-        split_mode_str = f"Max {self.duration_spin.value()}m" if self.split_duration_btn.isChecked() else f"Max {self.count_spin.value()} clips"
-        
-        output_folder = "N/A"
-        if self.video_files:
-            output_folder = "Merge/" if self.auto_save_cb.isChecked() else "Manual"
-
-        preview_text = f"""
-            <div style='background-color: #252526; border: 1px solid #3e3e42; border-radius: 8px; padding: 12px; margin-bottom: 20px;'>
-                <div style='color: #0078d4; font-weight: bold; font-size: 15px;'>Project Summary</div>
-                <div style='color: #aaa; font-size: 12px; margin-top: 5px;'>
-                    📦 Total: {total_clips} clips<br>
-                    🎞 Parts: {total_parts} batches<br>
-                    ⏱ Split: {split_mode_str}<br>
-                    📂 Folder: <span style='color: #0078d4;'>{output_folder}</span>
-                </div>
-            </div>
-            <div style='margin-bottom: 15px; color: #ffffff; font-size: 14px;'><b>Merge Execution Plan:</b></div>
-        """
-        
-        title_val = self.comp_title_edit.text().strip()
-        safe_title = "".join([c for c in title_val if c.isalnum() or c in (' ', '-', '_')]).strip()
-        if not safe_title: safe_title = "Project"
 
+        buf = io.StringIO()
+        buf.write(_SUMMARY_HTML(
+            total_clips=total_clips, total_parts=total_parts,
+            split_mode_str=request['split_mode_str'], output_folder=request['output_folder']
+        ))
+        
+        title_val = request['title'].strip()
+        safe_title = _sanitize_title(title_val, "Project")
+
+        display = self._display_cache  # Snapshot files that were cleared meanwhile are formatted on the spot
+        # 1-based position of every file in the snapshot (replaces per-batch list.index scans)
+        self._file_index = {f: n for n, f in enumerate(video_files, 1)}
+        # Prefix sums of durations: batches are contiguous runs, so each total is one subtraction
+        cum_durs = [0.0, *accumulate(durations.get(f, 0) for f in video_files)]
+        rendered_cards = {}
         for i, batch in enumerate(batches):
             # Same logic as VideoMergerWorker for consistency
-            if total_parts > 1 and self.auto_naming_cb.isChecked():
-                start_num = self.video_files.index(batch[0]) + 1
-                end_num = self.video_files.index(batch[-1]) + 1
+            if total_parts > 1 and request['auto_naming']:
+                start_num = self._file_index[batch[0]]
+                end_num = self._file_index[batch[-1]]
                 filename = f"{safe_title} clip-{start_num}-{end_num} merge {i+1}.mp4"
             elif total_parts > 1:
                 filename = f"{safe_title}_part{i+1}.mp4"
             else:
                 filename = f"{safe_title}.mp4"
-            start_num = self.video_files.index(batch[0]) + 1
-            end_num = self.video_files.index(batch[-1]) + 1
-            batch_dur = sum(self.video_durations.get(f, 0) for f in batch)
+            
+            batch_dur = cum_durs[self._file_index[batch[-1]]] - cum_durs[self._file_index[batch[0]] - 1]
+            
+            # Cards whose inputs did not change are reused as-is (only the first 10 rows show durations)
+            row_durs = tuple(durations.get(f, 0) for f in batch[:10])
+            card_key = (i, filename, tuple(batch), row_durs, batch_dur, max_dur)
+            card_html = self._batch_html_cache.get(card_key)
+            if card_html is not None:
+                rendered_cards[card_key] = card_html
+                buf.write(card_html)
+                continue
+            
             bm, bs = int(batch_dur // 60), int(batch_dur % 60)
             
             # Progress Bar for duration (relative to max_dur or default 10m)
@@ -721,78 +968,77 @@ class VideoMergerApp(QMainWindow):
             bar_color = "#0078d4" if usage_percent < 90 else "#d47800"
             
             # Card styling
-            preview_text += f"""
-            <div style='background-color: #1e1e20; border: 1px solid #333; border-radius: 8px; padding: 12px; margin-bottom: 15px; border-left: 5px solid {bar_color};'>
-                <div style='display: flex; justify-content: space-between;'>
-                    <span style='color: {bar_color}; font-weight: bold; font-size: 14px;'>PART {i+1}</span>
-                    <span style='background: #333; color: #aaa; padding: 2px 6px; border-radius: 4px; font-size: 10px; font-weight: bold;'>{bm}:{bs:02d}</span>
-                </div>
-                
-                <div style='margin-top: 8px; background-color: #111; height: 4px; border-radius: 2px;'>
-                    <div style='background-color: {bar_color}; width: {usage_percent}%; height: 100%; border-radius: 2px;'></div>
-                </div>
-
-                <div style='color: #eee; font-size: 11px; margin-top: 8px; font-family: monospace;'>{filename}</div>
-                
-                <div style='margin-top: 10px; border-top: 1px solid #2a2a2a; padding-top: 8px;'>
-            """
+            card_buf = io.StringIO()
+            card_buf.write(_CARD_HEAD_HTML(
+                index=i, part_number=i+1, bar_color=bar_color, duration=f"{bm}:{bs:02d}",
+                usage_percent=usage_percent, filename=filename
+            ))
             
-            # List more files (up to 15)
+            # List the first 10 files, then a "more clips" line
             for j, f in enumerate(batch):
-                # Sync part number back to main list (optional but very helpful)
-                # We'll do this in a separate loop for performance or just here
-                pass
-
                 if j >= 10:
-                    preview_text += f"<div style='color: #555; padding-left: 10px; font-size: 10px;'>... and {len(batch)-10} more clips</div>"
+                    card_buf.write(_MORE_ROWS_HTML(len(batch) - 10))
                     break
                 
-                fname = os.path.basename(f)
-                if len(fname) > 35: fname = fname[:32] + "..."
+                _, fname, dur_str = display.get(f) or _display_entry(os.path.basename(f))
                 
-                f_dur = self.video_durations.get(f, 0)
-                fm, fs = int(f_dur // 60), int(f_dur % 60)
+                if dur_str is None:
+                    f_dur = durations.get(f, 0)
+                    dur_str = f"{int(f_dur // 60)}:{int(f_dur % 60):02d}"
                 
                 # File row with duration
-                preview_text += f"""
-                <div style='color: #888; font-size: 10px; margin-bottom: 3px; display: flex; justify-content: space-between;'>
-                    <span style='color: #0078d4;'>•</span> <span style='flex-grow: 1; margin-left: 5px;'>{fname}</span>
-                    <span style='color: #444;'>[{fm}:{fs:02d}]</span>
-                </div>
-                """
+                card_buf.write(_ROW_HTML(fname=fname, duration=dur_str))
             
-            preview_text += "</div></div>"
+            card_buf.write(_CARD_TAIL_HTML)
+            card_html = card_buf.getvalue()
+            rendered_cards[card_key] = card_html
+            buf.write(card_html)
             
-        self.preview_label.setText(preview_text)
+        self._batch_html_cache = rendered_cards
+        self.set_preview_html(buf.getvalue())
         
         # Update Main List with Part Numbers
         self.sync_part_numbers_to_list(batches)
 
+    def set_preview_html(self, html):
+        """Swap the preview document in one repaint, keeping the scroll position"""
+        if html == self._preview_html:
+            return # Same document - skip the re-layout
+        self._preview_html = html
+        scroll_bar = self.preview_view.verticalScrollBar()
+        scroll_pos = scroll_bar.value()
+        self.preview_view.setUpdatesEnabled(False)
+        try:
+            self.preview_view.setHtml(html)
+            scroll_bar.setValue(scroll_pos)
+        finally:
+            self.preview_view.setUpdatesEnabled(True)
+
     def sync_part_numbers_to_list(self, batches):
         """Update the main QListWidget items to show which part they belong to"""
-        file_to_part = {}
-        for i, batch in enumerate(batches):
-            for f in batch:
-                file_to_part[f] = i + 1
-                
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            path = item.data(Qt.UserRole)
-            part_num = file_to_part.get(path, "?")
-            
-            # Get clean filename and duration
-            f_dur = self.video_durations.get(path, 0)
-            fm, fs = int(f_dur // 60), int(f_dur % 60)
-            fname = os.path.basename(path)
-            
-            # Update text with Part marker
-            # Color indicator via background or prefix
-            prefix = f"[PART {part_num}] "
-            item.setText(f"{prefix} {fname} - {fm}:{fs:02d}")
-            
-            # Subtly color code parts
-            colors = ["#1e1e20", "#252526"]
-            item.setBackground(QColor(colors[part_num % 2]))
+        # Coalesce all row edits into a single repaint
+        self.file_list.setUpdatesEnabled(False)
+        self.file_list.blockSignals(True)
+        try:
+            # Walk the plan directly - rows can be drag-reordered, so items are found by path
+            for part_num, batch in enumerate(batches, 1):
+                prefix = f"[PART {part_num}] "
+                bg = _ROW_BG[part_num & 1]
+                for path in batch:
+                    item = self._item_by_path.get(path)
+                    if item is None:
+                        continue # Cleared since the plan was made
+                    
+                    # Get clean filename and duration
+                    fname, _, dur_str = self._display_cache.get(path) or _display_entry(os.path.basename(path))
+                    
+                    # Update text with Part marker
+                    item.setText(f"{prefix} {fname} - {dur_str or '0:00'}")
+                    if item.background().color() != bg:
+                        item.setBackground(bg)
+        finally:
+            self.file_list.blockSignals(False)
+            self.file_list.setUpdatesEnabled(True)
 
     def select_all_videos(self):
         """Selected all items in the video list"""
@@ -800,7 +1046,21 @@ class VideoMergerApp(QMainWindow):
 
     def clear_videos(self):
         self.video_files.clear()
+        clear_batch_cache()
+        self._video_files_set.clear()
+        self._item_by_path.clear()
+        self._display_cache.clear()
+        self._file_index.clear()
         self.video_durations.clear()
+        self._files_version += 1
+        self._total_duration_sec = 0.0
+        # Stop probing the old list; results already in flight are ignored on arrival
+        for worker in self._info_workers:
+            worker.cancel()
+        self._pending_info_count = 0
+        self.is_calculating_info = False
+        self.anim_timer.stop()
+        self._preview_generation += 1  # Drop any plan still being computed for the old list
         self.file_list.clear()
         self.update_total_duration()
         self.update_ui_state()
@@ -813,6 +1073,7 @@ class VideoMergerApp(QMainWindow):
         self.merge_btn.setEnabled(has_videos and not is_processing and not is_calculating)
         self.clear_btn.setEnabled(has_videos and not is_processing)
         self.select_all_btn.setEnabled(has_videos and not is_processing)
+        self.refresh_btn.setEnabled(has_videos and not is_processing and not is_calculating)
         self.add_btn.setEnabled(not is_processing)
         
         if is_calculating:
@@ -842,6 +1103,7 @@ class VideoMergerApp(QMainWindow):
                 self.comp_title_edit.setText(title)
             else:
                 return # User cancelled
+        safe_title = _sanitize_title(title)
 
         if self.auto_save_cb.isChecked():
             # Auto-save logic
@@ -849,33 +1111,25 @@ class VideoMergerApp(QMainWindow):
             parent_dir = os.path.dirname(first_file)
             merge_dir = os.path.join(parent_dir, "Merge")
             
-            if not os.path.exists(merge_dir):
-                try:
-                    os.makedirs(merge_dir)
-                except Exception as e:
-                    QMessageBox.warning(self, "Folder Error", f"Could not create 'Merge' folder: {e}")
-                    # Fallback to dialog
-                    output_path = self.get_output_path_from_dialog()
-                    if not output_path: return
-                    self.start_merge_process(output_path)
-                    return
-            
-            safe_title = "".join([c for c in title if c.isalnum() or c in (' ', '-', '_')]).strip()
-            if not safe_title: safe_title = "merged_video"
+            try:
+                os.makedirs(merge_dir, exist_ok=True)
+            except OSError as e:
+                QMessageBox.warning(self, "Folder Error", f"Could not create 'Merge' folder: {e}")
+                # Fallback to dialog
+                output_path = self.get_output_path_from_dialog(safe_title)
+                if not output_path: return
+                self.start_merge_process(output_path, title)
+                return
             
             output_path = os.path.join(merge_dir, f"{safe_title}.mp4")
-            self.start_merge_process(output_path)
+            self.start_merge_process(output_path, title)
         else:
             # Manual save logic
-            output_path = self.get_output_path_from_dialog()
+            output_path = self.get_output_path_from_dialog(safe_title)
             if output_path:
-                self.start_merge_process(output_path)
+                self.start_merge_process(output_path, title)
 
-    def get_output_path_from_dialog(self):
-        title = self.comp_title_edit.text().strip()
-        safe_title = "".join([c for c in title if c.isalnum() or c in (' ', '-', '_')]).strip()
-        if not safe_title: safe_title = "merged_video"
-        
+    def get_output_path_from_dialog(self, safe_title):
         output_path, _ = QFileDialog.getSaveFileName(
             self, 
             "Save Merged Video", 
@@ -884,8 +1138,9 @@ class VideoMergerApp(QMainWindow):
         )
         return output_path
 
-    def start_merge_process(self, output_path):
-        self.start_time = time.time()
+    def start_merge_process(self, output_path, title):
+        self._elapsed.start()
+        self._elapsed_shown = None
         self.progress_timer.start(1000)
         
         max_dur = 0
@@ -896,6 +1151,8 @@ class VideoMergerApp(QMainWindow):
                 max_dur = self.duration_spin.value() * 60 # Convert mins to secs
             else:
                 max_count = self.count_spin.value()
+        self.video_merger.recompress_final = self.recompress_cb.isChecked()
+        self.video_merger.background_priority = self.background_cb.isChecked()
             
         self.worker_thread = VideoMergerWorker(
             self.video_files, 
@@ -904,8 +1161,10 @@ class VideoMergerApp(QMainWindow):
             max_duration=max_dur,
             max_clip_count=max_count,
             auto_naming=self.auto_naming_cb.isChecked(),
-            comp_title=self.comp_title_edit.text(),
-            standalone_threshold=standalone_thresh
+            comp_title=title,
+            standalone_threshold=standalone_thresh,
+            parallel_batches=self.parallel_cb.isChecked(),
+            durations=dict(self.video_durations) # Snapshot; every file was probed before Merge enabled
         )
         self.worker_thread.progress_updated.connect(self.update_progress)
         self.worker_thread.status_updated.connect(self.update_status)
@@ -922,10 +1181,12 @@ class VideoMergerApp(QMainWindow):
         self.status_label.setText(message)
 
     def update_time_display(self):
-        if self.start_time is None: return
-        elapsed = time.time() - self.start_time
-        elapsed_str = f"{int(elapsed//60):02d}:{int(elapsed%60):02d}"
-        self.detailed_status.setText(f"Elapsed: {elapsed_str}")
+        if not self._elapsed.isValid(): return
+        secs = self._elapsed.elapsed() // 1000
+        if secs == self._elapsed_shown: return
+        self._elapsed_shown = secs
+        m, s = divmod(secs, 60)
+        self.detailed_status.setText(f"Elapsed: {m:02d}:{s:02d}")
 
     def on_merge_completed(self, result_msg):
         self.progress_timer.stop()
@@ -937,14 +1198,19 @@ class VideoMergerApp(QMainWindow):
         
         QMessageBox.information(self, "Success", f"Video processing complete!\n\nOutput:\n{result_msg}")
 
-    def on_merge_failed(self, error_message):
+    def on_merge_failed(self, error_message, exc_info=None):
         self.progress_timer.stop()
         self.worker_thread = None
         self.progress_bar.setValue(0)
         self.status_label.setText("Failed")
         self.detailed_status.setText("Error occurred")
         self.update_ui_state()
-        QMessageBox.critical(self, "Error", f"Failed to merge videos:\n{error_message}")
+        box = QMessageBox(QMessageBox.Critical, "Error", f"Failed to merge videos:\n{error_message}",
+                          QMessageBox.Ok, self)
+        if exc_info is not None:
+            # Technical details live behind the dialog's "Show Details..." button
+            box.setDetailedText("".join(traceback.format_exception(*exc_info)))
+        box.exec_()
 
     def closeEvent(self, event):
         if self.is_processing():
@@ -958,12 +1224,70 @@ class VideoMergerApp(QMainWindow):
                 event.ignore()
         else:
             event.accept()
+        
+        if event.isAccepted():
+            for worker in list(self._info_workers):
+                worker.cancel()
+            self._preview_pool.waitForDone(2000)
+        
+        if event.isAccepted() and self._meta_cache is not None:
+            self.video_merger.metadata_cache = None
+            try:
+                self._meta_cache.close()
+            except Exception:
+                pass
+            self._meta_cache = None
 
     def check_for_updates(self):
-        """Start thread to check for updates from remote URL"""
-        self.update_worker = UpdateCheckerWorker(UPDATE_URL)
-        self.update_worker.update_available.connect(self.on_update_found)
-        self.update_worker.start()
+        """Fetch the remote version file on the event loop (no extra thread needed)"""
+        # One manager per window: it keeps the HTTPS connection alive, resumes the TLS session
+        # and caches the DNS answer, so repeat checks skip the handshakes
+        if self._nam is None:
+            self._nam = QNetworkAccessManager(self)
+        request = QNetworkRequest(QUrl(UPDATE_URL))
+        request.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
+        request.setTransferTimeout(10000)
+        # Conditional GET: an unchanged manifest comes back as an empty 304.
+        # (QNAM already sends Accept-Encoding: gzip and inflates the body itself.)
+        settings = QSettings("VideoMergerPro", "VideoMerger")
+        etag = settings.value("updater/etag", "", type=str)
+        last_modified = settings.value("updater/last_modified", "", type=str)
+        if etag:
+            request.setRawHeader(b"If-None-Match", etag.encode())
+        if last_modified:
+            request.setRawHeader(b"If-Modified-Since", last_modified.encode())
+        reply = self._nam.get(request)
+        reply.finished.connect(lambda: self._handle_update_reply(reply))
+
+    def _handle_update_reply(self, reply):
+        """Parse the version file and notify if a download is offered"""
+        try:
+            if reply.error() != QNetworkReply.NoError:
+                return  # Fail silently for placeholder URLs
+            settings = QSettings("VideoMergerPro", "VideoMerger")
+            if reply.attribute(QNetworkRequest.HttpStatusCodeAttribute) == 304:
+                body = settings.value("updater/manifest", "", type=str)  # Unchanged since last check
+                if not body:
+                    return
+                data = json.loads(body)
+            else:
+                # json.loads takes the raw bytes, so the body is never decoded into a second copy
+                manifest = json.loads(bytes(reply.readAll()))
+                # Only the fields read below are kept; release notes etc. don't go into the settings store
+                data = {key: manifest[key] for key in UPDATE_MANIFEST_KEYS if key in manifest}
+                settings.setValue("updater/etag", bytes(reply.rawHeader(b"ETag")).decode())
+                settings.setValue("updater/last_modified", bytes(reply.rawHeader(b"Last-Modified")).decode())
+                settings.setValue("updater/manifest", json.dumps(data))
+            version = data.get('version')
+            url = data.get('download_url')
+            message = data.get('message', '')
+            
+            if version and url:
+                self.on_update_found(version, url, message)
+        except Exception:
+            return
+        finally:
+            reply.deleteLater()
 
     def on_update_found(self, new_version, download_url, message):
         """Handle when a new version is detected"""
@@ -982,6 +1306,10 @@ class VideoMergerApp(QMainWindow):
 
 def main():
     app = QApplication(sys.argv)
+    # Same identity as QSettings("VideoMergerPro", "VideoMerger"); also names the AppData folder
+    # for the metadata cache, which would otherwise follow the python/exe name
+    app.setOrganizationName("VideoMergerPro")
+    app.setApplicationName("VideoMerger")
     window = VideoMergerApp()
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,60 @@
+"""
+Command-line checks for RobustVideoMerger's FFmpeg invocations
+Run from dev/: python -m unittest discover tests
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from video_merger_robust import RobustVideoMerger
+except ImportError: # imageio_ffmpeg missing
+    RobustVideoMerger = None
+
+
+@unittest.skipIf(RobustVideoMerger is None, "video_merger_robust dependencies not installed")
+class EncoderThreadArgsTest(unittest.TestCase):
+    """'-threads' must be an output option, or it only sizes input #0's decoder"""
+    
+    def setUp(self):
+        with mock.patch.object(RobustVideoMerger, 'check_gpu_support'):
+            self.merger = RobustVideoMerger()
+        self.merger.use_gpu = False
+        self.commands = []
+        
+        def run_ffmpeg(cmd, *args, **kwargs):
+            self.commands.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, '', '')
+        self.merger._run_ffmpeg = run_ffmpeg
+    
+    def build(self, **kwargs) -> list:
+        self.merger._ffmpeg_merge_block(['a.mp4', 'b.mp4'], 'out.mp4', {}, allow_copy=False, **kwargs)
+        return self.commands[-1]
+    
+    def assert_threads_after_inputs(self, cmd: list, threads: str):
+        last_input = max(i for i, arg in enumerate(cmd) if arg == '-i')
+        self.assertIn('-threads', cmd)
+        self.assertGreater(cmd.index('-threads'), last_input)
+        self.assertEqual(cmd[cmd.index('-threads') + 1], threads)
+        self.assertLess(cmd.index('-threads'), cmd.index('out.mp4'))
+    
+    def test_thread_budget_goes_to_encoder(self):
+        cmd = self.build(threads=3)
+        self.assert_threads_after_inputs(cmd, '3')
+        self.assertLess(cmd.index('-filter_complex_threads'), cmd.index('-i'))
+    
+    def test_max_threads_goes_to_encoder(self):
+        self.merger.max_threads = 1
+        self.assert_threads_after_inputs(self.build(), '1')
+    
+    def test_safe_mode_encoder_is_single_threaded(self):
+        self.assert_threads_after_inputs(self.build(safe=True), '1')
+
+
+if __name__ == '__main__':
+    unittest.main()
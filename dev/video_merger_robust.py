@@ -10,9 +10,147 @@ import json
 import shutil
 import platform
 import re
+import sqlite3
+import stat
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Callable, Optional
 import imageio_ffmpeg
 
+try:
+    # Optional: compiles the batch packer for very large projects
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+try:
+    # Optional: PyAV reads container headers in-process, so probing a clip spawns nothing
+    import av
+except ImportError:
+    av = None
+
+# Patterns for the "ffmpeg -i" input dump, compiled once for every probe thread
+_INPUT_SPLIT_RE = re.compile(r"^Input #(\d+),", re.MULTILINE)
+_DUR_RE = re.compile(r"Duration:\s(\d+):(\d+):(\d+\.\d+)")
+_RES_RE = re.compile(r"Video:.*?\s(\d{2,})x(\d{2,})")
+_CODEC_RE = re.compile(r"Video:\s(\w+)[^,]*,\s(\w+)")
+_FPS_RE = re.compile(r"Video:.*?\s(\d+(?:\.\d+)?)\sfps")
+_PROFILE_RE = re.compile(r"Video:\s\w+\s\(([^)/]+)\)")
+_TBN_RE = re.compile(r"Video:.*?\s(\d+(?:\.\d+)?)(k?)\stbn")
+_AUDIO_RE = re.compile(r"Audio:\s(\w+)[^,]*,\s(\d+)\sHz(?:,\s([^,\n]+))?")
+# FFmpeg errors that fail the same way on every retry. Anything else (NVENC session limit, a
+# clip NVDEC can't decode, out of VRAM) may pass next time and must not disable the GPU.
+_PERMANENT_GPU_ERRORS = ('Unknown encoder', 'No such filter', 'Unrecognized option', 'Option not found',
+                         'No NVENC capable devices found', 'Cannot load libcuda', 'Cannot load nvcuda',
+                         'Cannot load libnvidia-encode', 'Cannot load nvEncodeAPI')
+_CHANNELS_RE = re.compile(r"(\d+) channels")
+_LAYOUT_CHANNELS = {'mono': 1, 'stereo': 2, '2.1': 3, '3.0': 3, 'quad': 4, '4.0': 4, '5.0': 5,
+                    '5.0(side)': 5, '5.1': 6, '5.1(side)': 6, '6.1': 7, '7.1': 8}
+
+
+def _pack_batch_bounds(durations, bounds, max_dur, max_count, standalone_thresh):
+    """
+    Greedy batch packing over a sequence of durations.
+    Writes the start index of every batch into bounds (ending with len(durations))
+    and returns how many entries were written. bounds needs len(durations) + 1 slots.
+    """
+    n = len(durations)
+    k = 1
+    bounds[0] = 0
+    cur_len = 0
+    cur_dur = 0.0
+    for i in range(n):
+        d = durations[i]
+        if standalone_thresh > 0 and d >= standalone_thresh:
+            # Long video gets a batch of its own
+            if cur_len > 0:
+                bounds[k] = i
+                k += 1
+            bounds[k] = i + 1
+            k += 1
+            cur_len = 0
+            cur_dur = 0.0
+        elif (max_count > 0 and cur_len >= max_count) or (max_dur > 0 and cur_len > 0 and cur_dur + d > max_dur):
+            bounds[k] = i
+            k += 1
+            cur_len = 1
+            cur_dur = d
+        else:
+            cur_len += 1
+            cur_dur += d
+    if cur_len > 0:
+        bounds[k] = n
+        k += 1
+    return k
+
+
+_pack_batch_bounds_jit = njit(cache=True)(_pack_batch_bounds) if njit else None
+
+
+class MergeCancelled(Exception):
+    """Raised out of merge_videos once its cancel_event is set; FFmpeg has been stopped by then"""
+
+
+class _LinkedEvent(threading.Event):
+    """An Event that also reads as set once its parent is (a block abort inside a cancellable merge)"""
+    
+    def __init__(self, parent: Optional[threading.Event] = None):
+        super().__init__()
+        self._parent = parent
+    
+    def is_set(self) -> bool:
+        return super().is_set() or (self._parent is not None and self._parent.is_set())
+
+
+class MetadataCache:
+    """
+    get_video_info results persisted in SQLite so unchanged files are never probed twice.
+    Keys embed the file's mtime and size, so an edited file simply misses.
+    One connection serves every thread (pool and Qt threads alike); each statement is a
+    sub-millisecond key lookup or upsert, so a lock around it costs the probes nothing.
+    """
+    
+    SCHEMA_VERSION = 2 # Bump when probes gain fields; older rows are dropped on open
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, json TEXT)")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            self._db.execute("DELETE FROM meta")
+            self._db.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+    
+    @staticmethod
+    def make_key(path: str, st: os.stat_result) -> str:
+        return f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+    
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT json FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, key: str, info: dict):
+        data = json.dumps(info)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, data))
+    
+    def clear_cache(self):
+        """Forget everything (the UI's Refresh action)"""
+        with self._lock:
+            self._db.execute("DELETE FROM meta")
+    
+    def close(self):
+        with self._lock:
+            try: self._db.close()
+            except: pass
+
 
 class RobustVideoMerger:
     """
@@ -20,6 +158,15 @@ class RobustVideoMerger:
     Handles videos with different formats, resolutions, and frame rates
     """
     
+    SINGLE_PASS_MAX_INPUTS = 48  # Decoders one process may hold open at level 0
+    MAX_CMD_CHARS = 24000        # Headroom below the 32767-char Windows command line
+    CMD_CHARS_PER_INPUT = 40     # Quotes, '-i' and any '-hwaccel cuda ...' per input
+    FILTER_SCRIPT_CHARS = 4000   # Longer filter graphs go through -filter_complex_script
+    PROBE_GROUP_SIZE = 32        # Files per multi-input ffmpeg probe (keeps command lines short)
+    CANCEL_POLL_S = 0.1          # How often a running FFmpeg checks for a cancel request
+    
+    _gpu_probe_results = {}      # ffmpeg_path -> (use_gpu, gpu_codec), shared by every instance
+    
     def __init__(self):
         """Initialize the video merger with default settings"""
         self.target_width = 1920
@@ -29,11 +176,21 @@ class RobustVideoMerger:
         self.audio_codec = 'aac'
         self.use_gpu = False
         self.gpu_codec = 'h264_nvenc'  # NVIDIA hardware encoder
+        self._cuda_filters_ok = True  # Cleared if the all-GPU (scale_cuda/pad_cuda) graph can't run at all
+        self._gpu_state_lock = threading.Lock() # Block encoders clear the two flags from worker threads
         self.ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+        self.ffprobe_path = self._find_ffprobe()
         self.performance_level = 0 # 0=Normal, 1=Potato (<4GB), 2=Poverty (<1.5GB)
         self.potato_mode = False
         self.block_size = 10 # Default batch size
         self.max_threads = 0 # 0 means auto
+        self.block_workers = max(1, min(4, (os.cpu_count() or 2) // 2)) # Intermediate blocks encoded at once
+        self.recompress_final = False # Re-encode the joined blocks at medium/crf 28 instead of remuxing
+        self._info_cache = {} # path -> ((mtime_ns, size), info); saves re-probing clips for every block
+        self.metadata_cache = None # Optional MetadataCache; makes probes survive restarts
+        self.background_priority = False # Run encodes below normal CPU priority so the GUI stays smooth
+        self._nice_path = shutil.which('nice') if platform.system() != "Windows" else None
+        self._si = self._build_startupinfo() # Immutable, shared by every spawn
         self.check_gpu_support()
     
     def optimize_for_low_end(self, level: int):
@@ -47,11 +204,13 @@ class RobustVideoMerger:
         
         if level >= 1:
             self.block_size = 4
+            self.block_workers = min(2, self.block_workers) # Each encoder holds its own frame buffers
             print(f"Engine: Potato Mode Active (Level {level})")
         
         if level >= 2:
             self.block_size = 2 # Process only 2 clips at once
             self.max_threads = 1 # Force single-thread to save RAM
+            self.block_workers = 1
             print("Engine: Extreme Poverty Mode Active (Single-threaded processing enabled)")
     
     def calculate_batches(self, video_files: List[str], max_duration_sec: float = 0, max_clip_count: int = 0, 
@@ -76,55 +235,41 @@ class RobustVideoMerger:
         if max_clip_count > 0 and standalone_threshold_sec <= 0:
             return self.calculate_batches_by_count(video_files, max_clip_count)
             
-        batches = []
-        current_batch = []
-        current_duration = 0.0
+        if cached_durations is not None:
+            # CRITICAL: If cached_durations is provided, we MUST NOT perform slow I/O on the main thread
+            durations = [cached_durations.get(f, 0) or 0 for f in video_files]
+        else:
+            # Only fallback to slow fetch if no cache was provided (usually for command line usage)
+            if max_duration_sec > 0 or standalone_threshold_sec > 0:
+                self.probe_many(video_files) # Probe in parallel; the loop below reads the cache
+            durations = []
+            for file in video_files:
+                try:
+                    durations.append(self.get_video_info(file).get('duration', 0))
+                except Exception:
+                    # Silently handle missing info - UI will show "Analyzing" state anyway
+                    durations.append(0)
         
-        for file in video_files:
-            try:
-                # CRITICAL: If cached_durations is provided, we MUST NOT perform slow I/O on the main thread
-                if cached_durations is not None:
-                    duration = cached_durations.get(file, 0)
-                else:
-                    # Only fallback to slow fetch if no cache was provided (usually for command line usage)
-                    info = self.get_video_info(file)
-                    duration = info.get('duration', 0)
-                
-                # [NEW] Logic for Auto-Standalone
-                is_standalone = standalone_threshold_sec > 0 and duration >= standalone_threshold_sec
-                
-                if is_standalone:
-                    # Finalize current batch if not empty
-                    if current_batch:
-                        batches.append(current_batch)
-                    # Create a standalone batch for this file
-                    batches.append([file])
-                    current_batch = []
-                    current_duration = 0.0
-                    continue
+        bounds = self._pack_batches(durations, max_duration_sec, max_clip_count, standalone_threshold_sec)
+        return [video_files[bounds[j] : bounds[j + 1]] for j in range(len(bounds) - 1)]
 
-                # Standard batching logic
-                if max_clip_count > 0 and len(current_batch) >= max_clip_count:
-                    batches.append(current_batch)
-                    current_batch = [file]
-                    current_duration = duration
-                elif max_duration_sec > 0 and current_batch and (current_duration + duration > max_duration_sec):
-                    batches.append(current_batch)
-                    current_batch = [file]
-                    current_duration = duration
-                else:
-                    current_batch.append(file)
-                    current_duration += duration
-                    
-            except Exception as e:
-                # Silently handle missing info - UI will show "Analyzing" state anyway
-                current_batch.append(file)
-        
-        # Add the last batch if it exists
-        if current_batch:
-            batches.append(current_batch)
-            
-        return batches
+    NUMBA_MIN_CLIPS = 256 # Below this the JIT call overhead outweighs the loop itself
+
+    def _pack_batches(self, durations: List[float], max_dur: float, max_count: int,
+                      standalone_thresh: float) -> List[int]:
+        """Batch start indices for the given durations, using the compiled packer for big lists"""
+        n = len(durations)
+        if _pack_batch_bounds_jit is not None and n >= self.NUMBA_MIN_CLIPS:
+            try:
+                bounds = np.empty(n + 1, dtype=np.int32)
+                k = _pack_batch_bounds_jit(np.asarray(durations, dtype=np.float64), bounds,
+                                           float(max_dur), int(max_count), float(standalone_thresh))
+                return bounds[:k].tolist()
+            except Exception:
+                pass # e.g. no writable JIT cache in a frozen build - the Python packer gives the same result
+        bounds = [0] * (n + 1)
+        k = _pack_batch_bounds(durations, bounds, max_dur, max_count, standalone_thresh)
+        return bounds[:k]
 
     def calculate_batches_by_count(self, video_files: List[str], max_clip_count: int) -> List[List[str]]:
         """
@@ -141,49 +286,128 @@ class RobustVideoMerger:
             batches.append(video_files[i : i + max_clip_count])
         return batches
     
-    def _get_startupinfo(self):
-        """Helper to suppress console window on Windows and set priority"""
+    def _build_startupinfo(self):
+        """Helper to suppress console window on Windows (cached in self._si)"""
         if platform.system() == "Windows":
             startupinfo = subprocess.STARTUPINFO()
             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            if self.potato_mode:
-                # 0x00004000 = BELOW_NORMAL_PRIORITY_CLASS
-                startupinfo.dwFlags |= 0x00004000 
             return startupinfo
         return None
 
+    def _background_spawn(self) -> tuple:
+        """
+        (command prefix, extra Popen kwargs) that start an encode below normal priority.
+        Empty unless background_priority or potato mode is on.
+        """
+        if not (self.background_priority or self.potato_mode):
+            return [], {}
+        if platform.system() == "Windows":
+            return [], {'creationflags': subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+        # nice(1) execs FFmpeg in its place; preexec_fn=os.nice could deadlock a child forked from our threads
+        return ([self._nice_path, '-n', '10'] if self._nice_path else []), {}
+
     def check_gpu_support(self):
-        """Check if NVIDIA GPU acceleration is available"""
-        si = self._get_startupinfo()
+        """
+        Detect a working hardware H.264 encoder once at startup.
+        Being known to FFmpeg ('-h encoder=NAME') only means FFmpeg was built with it,
+        so each candidate gets a tiny test encode before it is trusted.
+        The outcome is cached per ffmpeg binary, so later instances skip the spawns.
+        """
+        cached = RobustVideoMerger._gpu_probe_results.get(self.ffmpeg_path)
+        if cached is not None:
+            self.use_gpu, self.gpu_codec = cached
+            return
+        
+        self._detect_gpu_encoder()
+        RobustVideoMerger._gpu_probe_results[self.ffmpeg_path] = (self.use_gpu, self.gpu_codec)
+
+    def _detect_gpu_encoder(self):
+        """Run the encoder lookups and test encodes behind check_gpu_support"""
+        si = self._si
+        self.use_gpu = False
+        
+        candidates = []
+        if self._has_nvidia_gpu(si):
+            candidates += ['h264_nvenc', 'hevc_nvenc']
+        if platform.system() == "Darwin":
+            candidates.append('h264_videotoolbox')
+        else:
+            candidates += ['h264_qsv', 'h264_amf']
+        
+        # Checked in order of preference, stopping at the first that exists and works
+        for encoder in candidates:
+            if self._has_encoder(encoder, si) and self._encoder_works(encoder, si):
+                self.use_gpu = True
+                self.gpu_codec = encoder
+                print(f"GPU acceleration enabled ({encoder})")
+                return
+        print("GPU acceleration not available - using CPU encoding")
+
+    def _has_encoder(self, name: str, si) -> bool:
+        """Ask FFmpeg about one encoder (a short help block) instead of scanning the whole list"""
         try:
-            # Check if nvidia-smi is available (indicates NVIDIA GPU)
-            result = subprocess.run(['nvidia-smi'], capture_output=True, check=True, startupinfo=si)
-            if result.returncode == 0:
-                # Check if FFmpeg supports h264_nvenc
-                result = subprocess.run([self.ffmpeg_path, '-hide_banner', '-encoders'], 
-                                      capture_output=True, text=True, check=True, startupinfo=si)
-                if 'h264_nvenc' in result.stdout:
-                    self.use_gpu = True
-                    self.gpu_codec = 'h264_nvenc'
-                    print("GPU acceleration enabled (NVIDIA RTX detected)")
-                elif 'hevc_nvenc' in result.stdout:
-                    self.use_gpu = True
-                    self.gpu_codec = 'hevc_nvenc'
-                    print("GPU acceleration enabled with HEVC (NVIDIA RTX detected)")
-                else:
-                    print("NVIDIA GPU detected but hardware encoding not available in FFmpeg")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print("GPU acceleration not available - using CPU encoding")
-            self.use_gpu = False
+            res = subprocess.run([self.ffmpeg_path, '-hide_banner', '-h', f'encoder={name}'],
+                                 capture_output=True, startupinfo=si)
+        except OSError:
+            return False
+        return res.returncode == 0 and b'is not recognized' not in res.stdout + res.stderr
+
+    def _has_nvidia_gpu(self, si) -> bool:
+        """nvidia-smi is only present (and succeeds) on machines with an NVIDIA driver"""
+        try:
+            subprocess.run(['nvidia-smi'], capture_output=True, check=True, startupinfo=si)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+            return False
+
+    def _encoder_works(self, encoder: str, si) -> bool:
+        """Encode a single blank frame to confirm the device behind the encoder is usable"""
+        cmd = [self.ffmpeg_path, '-hide_banner', '-v', 'error', '-f', 'lavfi', '-i', 'color=black:s=256x256:d=0.1',
+               '-frames:v', '1', '-c:v', encoder, '-f', 'null', '-']
+        try:
+            return subprocess.run(cmd, capture_output=True, timeout=15, startupinfo=si).returncode == 0
+        except (subprocess.TimeoutExpired, OSError):
+            return False
+
+    def _video_codec_args(self, preset: str, crf: int, software: bool = False) -> List[str]:
+        """
+        Video encoder arguments for the detected encoder.
+        crf is mapped onto each hardware encoder's constant-quality knob; libx264 is the fallback
+        (and is forced with software=True).
+        """
+        fast = preset in ('ultrafast', 'superfast', 'veryfast')
+        codec = self.gpu_codec if self.use_gpu and not software else self.codec
+        
+        if codec.endswith('_nvenc'):
+            return ['-c:v', codec, '-preset', 'p1' if fast else 'p4', '-tune', 'hq', '-rc', 'vbr', '-cq', str(crf),
+                    '-b:v', '0', '-spatial_aq', '1']
+        if codec.endswith('_qsv'):
+            return ['-c:v', codec, '-preset', 'veryfast' if fast else 'medium',
+                    '-global_quality', str(crf), '-look_ahead', '1']
+        if codec.endswith('_amf'):
+            return ['-c:v', codec, '-quality', 'speed' if fast else 'balanced',
+                    '-rc', 'cqp', '-qp_i', str(crf), '-qp_p', str(crf)]
+        if codec.endswith('_videotoolbox'):
+            # -q:v runs 1-100 (higher is better): crf 23 -> 64, crf 28 -> 54
+            return ['-c:v', codec, '-q:v', str(max(1, min(100, 110 - 2 * crf)))]
+        return ['-c:v', 'libx264', '-preset', preset, '-crf', str(crf)]
     
     def merge_videos(self, 
                     video_files: List[str], 
                     output_path: str,
-                    progress_callback: Optional[Callable[[int, str], None]] = None) -> bool:
+                    progress_callback: Optional[Callable[[int, str], None]] = None,
+                    cancel_event: Optional[threading.Event] = None,
+                    codec_copy: Optional[bool] = None,
+                    parallel_merges: int = 1) -> bool:
         """
         Merge multiple video files into a single output video.
         Uses a multi-stage FFmpeg process for reliability.
         [NEW] Optimization: If only 1 file, just copy it to save time/quality.
+        cancel_event: When set, the running FFmpeg is stopped and MergeCancelled is raised.
+        codec_copy: The caller's can_concat_copy() verdict, so it isn't worked out twice (None = check here).
+            A remux that fails still falls back to re-encoding.
+        parallel_merges: How many merge_videos calls run side by side; CPU threads, block
+            encoders and single-pass decoders are split between them.
         """
         if not video_files: return False
         
@@ -195,7 +419,7 @@ class RobustVideoMerger:
                 if os.path.abspath(video_files[0]) == os.path.abspath(output_path):
                     # Already the same file, nothing to do
                     return True
-                shutil.copy2(video_files[0], output_path)
+                self._fast_copy(video_files[0], output_path)
                 if progress_callback: progress_callback(100, "Fast Copy Complete!")
                 return True
             except Exception as copy_e:
@@ -204,112 +428,537 @@ class RobustVideoMerger:
                 pass
 
         temp_files = []
-        si = self._get_startupinfo()
+        # Private scratch folder: concurrent merges can't collide and a crash leaves no litter in the CWD
+        tmpdir = tempfile.mkdtemp(prefix='vmp_')
+        si = self._si
         try:
-            # Check if FFmpeg is available
-            subprocess.run([self.ffmpeg_path, '-version'], capture_output=True, check=True, startupinfo=si)
+            if not codec_copy:
+                # Check if FFmpeg is available (a stream copy below reports a missing one just as well)
+                subprocess.run([self.ffmpeg_path, '-version'], capture_output=True, check=True, startupinfo=si)
+            
+            # Probe every clip once up front, before any encoder starts; everything below reads meta
+            meta = self._collect_meta(video_files)
+            
+            # Fast path: identical encodings can be joined by the concat demuxer without re-encoding
+            if codec_copy is None:
+                codec_copy = self._can_stream_copy(video_files, meta)
+            if codec_copy:
+                if progress_callback:
+                    progress_callback(10, "Matching formats detected. Joining without re-encoding...")
+                try:
+                    self._ffmpeg_concat_copy(video_files, output_path, cancel_event=cancel_event)
+                    if progress_callback:
+                        progress_callback(100, "Success!")
+                    return True
+                except MergeCancelled:
+                    raise
+                except Exception as copy_e:
+                    # Re-encode below instead of failing the part
+                    print(f"Stream copy failed: {copy_e}. Falling back to re-encode...")
+            
+            # One FFmpeg for everything: a single encoder session, no temp files, no re-spawns
+            # This merge's share of the cores (0 = all, FFmpeg's own default)
+            cpu_share = max(1, (os.cpu_count() or 1) // parallel_merges) if parallel_merges > 1 else 0
+            if self._fits_single_pass(video_files, parallel_merges):
+                on_time = None
+                if progress_callback:
+                    progress_callback(10, "Encoding all clips in one pass...")
+                    # One process does all the work, so its output position is the progress (10-99%)
+                    total = sum(meta.get(f, {}).get('duration') or 0 for f in video_files)
+                    if total > 0:
+                        on_time = lambda t: progress_callback(10 + int(min(t / total, 1.0) * 89),
+                                                              "Encoding all clips in one pass...")
+                preset, crf = ('medium', 28) if self.recompress_final else ('ultrafast', 23)
+                try:
+                    self._ffmpeg_merge_block(video_files, output_path, meta, preset=preset, crf=crf,
+                                             allow_copy=False, threads=cpu_share, cancel_event=cancel_event,
+                                             on_time=on_time)
+                    if progress_callback:
+                        progress_callback(100, "Success!")
+                    return True
+                except MergeCancelled:
+                    raise
+                except Exception as single_e:
+                    print(f"Single-pass merge failed: {single_e}. Falling back to blocks...")
             
             # Process in blocks to stay stable and avoid command length limits
             BLOCK_SIZE = self.block_size
             
             # Step 1: Merge into intermediate blocks
-            total_blocks = (len(video_files) + BLOCK_SIZE - 1) // BLOCK_SIZE
+            blocks = [video_files[i : i + BLOCK_SIZE] for i in range(0, len(video_files), BLOCK_SIZE)]
+            total_blocks = len(blocks)
             
-            for i in range(0, len(video_files), BLOCK_SIZE):
-                block_files = video_files[i : i + BLOCK_SIZE]
-                block_num = (i // BLOCK_SIZE) + 1
-                
-                temp_output = f"temp_block_{block_num}_{int(time.time())}.mp4"
-                temp_files.append(temp_output)
-                
-                if progress_callback:
-                    progress_callback(int((block_num-1)/total_blocks * 80), 
-                                     f"Merging Batch {block_num}/{total_blocks}...")
-                
-                # Use faster settings for intermediate blocks
-                self._ffmpeg_merge_block(block_files, temp_output, preset='ultrafast', crf=23)
+            # Blocks are independent FFmpeg processes writing their own temp files, so several
+            # run at once (threads only wait on the children). NVENC caps concurrent sessions.
+            # Merges running side by side split the encoder budget between them.
+            workers = min(max(1, self.block_workers // parallel_merges), total_blocks)
+            if self.use_gpu:
+                workers = min(max(1, 2 // parallel_merges), workers)
+            block_threads = max(1, (os.cpu_count() or 1) // (workers * parallel_merges)) # Share the cores between blocks
+            finished = 0
+            # Set on the first block failure: the other encodes are wasted work once safe mode takes over
+            block_stop = _LinkedEvent(cancel_event)
+            block_error = None
             
-            # Step 2: Merge the intermediate blocks into the final result
-            if progress_callback:
-                progress_callback(90, "Finalizing output (Optimizing Size)...")
+            def collect(futures):
+                nonlocal finished, block_error
+                for future in futures:
+                    try:
+                        future.result()
+                        finished += 1
+                    except MergeCancelled:
+                        pass # A user cancel or our own abort; sorted out once the pool is idle
+                    except Exception as block_e:
+                        if block_error is None:
+                            block_error = block_e
+                            block_stop.set()
             
-            # Final merge uses 'medium' preset and higher CRF for best size-to-quality ratio
-            self._ffmpeg_merge_block(temp_files, output_path, preset='medium', crf=28)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                running = set()
+                for block_num, block_files in enumerate(blocks, 1):
+                    if len(running) >= workers:
+                        done, running = wait(running, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    if block_stop.is_set():
+                        break
+                    
+                    temp_output = os.path.join(tmpdir, f"block_{block_num}_{uuid.uuid4().hex}.mp4")
+                    temp_files.append(temp_output)
+                    
+                    if progress_callback:
+                        progress_callback(int(finished/total_blocks * 80), 
+                                         f"Merging Batch {block_num}/{total_blocks}...")
+                    
+                    # Use faster settings for intermediate blocks. Unless the final pass re-encodes
+                    # anyway, every block is normalized so the blocks can be remuxed together.
+                    running.add(pool.submit(self._ffmpeg_merge_block, block_files, temp_output, meta,
+                                            preset='ultrafast', crf=23,
+                                            allow_copy=self.recompress_final, faststart=False,
+                                            threads=block_threads, cancel_event=block_stop))
+                collect(wait(running).done)
+            if cancel_event is not None and cancel_event.is_set():
+                raise MergeCancelled()
+            if block_error is not None:
+                raise block_error # Every block encode has stopped; on to the safe-mode fallback
+            
+            # Step 2: Merge the intermediate blocks into the final result
+            block_meta = self._collect_meta(temp_files) if len(temp_files) > 1 else {}
+            if self.recompress_final:
+                if progress_callback:
+                    progress_callback(90, "Finalizing output (Optimizing Size)...")
+                # Opt-in second encode: 'medium' preset and higher CRF for best size-to-quality ratio
+                self._ffmpeg_merge_block(temp_files, output_path, block_meta, preset='medium', crf=28,
+                                         allow_copy=False, threads=cpu_share, cancel_event=cancel_event)
+            else:
+                if progress_callback:
+                    progress_callback(90, "Finalizing output...")
+                if len(temp_files) == 1:
+                    shutil.move(temp_files[0], output_path)
+                else:
+                    # Blocks share one encoding, so joining them is a remux bounded by disk speed;
+                    # the block merge still re-encodes if the remux is refused
+                    self._ffmpeg_merge_block(temp_files, output_path, block_meta, preset='medium', crf=28,
+                                             threads=cpu_share, cancel_event=cancel_event)
             
             if progress_callback:
                 progress_callback(100, "Success!")
             return True
 
+        except MergeCancelled:
+            self._remove_partial(output_path)
+            raise
         except Exception as e:
             # Fallback
             print(f"FFmpeg failed with: {e}")
             try:
-                if self.performance_level >= 2:
-                    raise Exception("Internal fallback (MoviePy) disabled in Maximum Stability mode to save RAM.")
-                
                 if progress_callback:
                     progress_callback(0, "Primary engine failed. Using safe fallback...")
-                return self._merge_with_moviepy(video_files, output_path, progress_callback)
-            except Exception as mp_e:
-                raise Exception(f"Merge failed on both engines.\nFFmpeg: {e}\nInternal: {mp_e}")
+                return self._merge_safe_mode(video_files, output_path, progress_callback, cancel_event)
+            except MergeCancelled:
+                self._remove_partial(output_path)
+                raise
+            except Exception as safe_e:
+                raise Exception(f"Merge failed in both modes.\nFFmpeg: {e}\nSafe mode: {safe_e}")
         finally:
             # Cleanup ALWAYS
-            for f in temp_files:
-                if os.path.exists(f): 
-                    try: os.remove(f)
-                    except: pass
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def _remove_partial(self, path: str):
+        """Delete the half-written output a cancelled FFmpeg leaves behind"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _run_ffmpeg(self, cmd: List[str], cancel_event: Optional[threading.Event] = None,
+                    on_time: Optional[Callable[[float], None]] = None) -> subprocess.CompletedProcess:
+        """
+        subprocess.run(cmd, capture_output=True, text=True), but watching cancel_event while FFmpeg runs.
+        Once it is set FFmpeg gets terminate(), kill() if it is still alive 2s later, and MergeCancelled is raised.
+        on_time: Called with the output position in seconds while FFmpeg encodes (-progress pipe:1).
+        Every encode and remux comes through here, so this is also where background priority applies.
+        """
+        prefix, priority = self._background_spawn()
+        cmd = prefix + cmd
+        if on_time is not None:
+            at = len(prefix) + 1 # Global options, right after the executable
+            cmd = cmd[:at] + ['-progress', 'pipe:1', '-nostats'] + cmd[at:]
+        if cancel_event is None and on_time is None:
+            return subprocess.run(cmd, capture_output=True, text=True, startupinfo=self._si, **priority)
+        if cancel_event is not None and cancel_event.is_set():
+            raise MergeCancelled()
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                startupinfo=self._si, **priority)
+        if on_time is not None:
+            return self._wait_with_progress(proc, cmd, cancel_event, on_time)
+        while True:
+            try:
+                # communicate keeps draining both pipes between timeouts, so nothing is lost
+                stdout, stderr = proc.communicate(timeout=self.CANCEL_POLL_S)
+                return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                if not cancel_event.is_set():
+                    continue
+                proc.terminate()
+                try:
+                    proc.communicate(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.communicate()
+                raise MergeCancelled()
+
+    def _wait_with_progress(self, proc: subprocess.Popen, cmd: List[str], cancel_event: Optional[threading.Event],
+                            on_time: Callable[[float], None]) -> subprocess.CompletedProcess:
+        """
+        Wait for an FFmpeg started with -progress pipe:1, feeding its "out_time_us=..." lines to on_time.
+        Both pipes are read on helper threads so FFmpeg never blocks on a full pipe.
+        """
+        stderr = []
+        
+        def read_progress():
+            for line in proc.stdout:
+                key, _, value = line.strip().partition('=')
+                if key == 'out_time_us':
+                    try:
+                        on_time(int(value) / 1_000_000)
+                    except Exception:
+                        pass # "N/A" before the first frame; a failing callback must not stop the reads
+        
+        readers = [threading.Thread(target=read_progress, daemon=True),
+                   threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)]
+        for reader in readers:
+            reader.start()
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=self.CANCEL_POLL_S)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_event is None or not cancel_event.is_set():
+                        continue
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                        proc.wait()
+                    raise MergeCancelled()
+        finally:
+            for reader in readers:
+                reader.join()
+        return subprocess.CompletedProcess(cmd, proc.returncode, '', ''.join(stderr))
+
+    def _fast_copy(self, src: str, dst: str):
+        """
+        Put a copy of src at dst as cheaply as the filesystem allows:
+        a hard link (same volume, no data written), then copy_file_range
+        (a reflink on btrfs/XFS), then a plain shutil.copy2.
+        """
+        if os.path.lexists(dst):
+            os.remove(dst) # The save dialog already confirmed the overwrite
+        try:
+            os.link(src, dst)
+            return
+        except (OSError, AttributeError):
+            pass # Other volume, FAT/exFAT, or no permission to link
+        
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    shutil.copystat(src, dst)
+                    return
+            except OSError:
+                pass # Not supported between these filesystems
+        shutil.copy2(src, dst)
+
+    def _fits_single_pass(self, video_files: List[str], parallel_merges: int = 1) -> bool:
+        """
+        True when one FFmpeg process can take every input directly.
+        Each input keeps its own decoder open, so low-RAM levels stay on blocks, merges running
+        side by side share the decoder budget, and the input paths must fit the Windows
+        command line (the filter graph goes in a script file).
+        """
+        max_inputs = self.SINGLE_PASS_MAX_INPUTS // parallel_merges
+        if self.performance_level > 0 or len(video_files) > max_inputs:
+            return False
+        cmd_chars = sum(len(os.path.abspath(f)) + self.CMD_CHARS_PER_INPUT for f in video_files)
+        return cmd_chars < self.MAX_CMD_CHARS
+
+    def can_concat_copy(self, video_files: List[str]) -> bool:
+        """
+        True when merge_videos can join these files losslessly with the concat demuxer
+        (a disk-bound remux instead of a transcode). Probes through the info cache.
+        """
+        if len(video_files) < 2:
+            return False
+        return self._can_stream_copy(video_files, self._collect_meta(video_files))
+
+    def _stream_signature(self, info: dict) -> Optional[tuple]:
+        """
+        Everything that has to match for the concat demuxer to join files losslessly.
+        None when any of it is unknown: remuxing mismatched streams (mono after stereo, a Main
+        profile clip after High) gives a broken or desynced file, so unknown means re-encode.
+        """
+        video = (info.get('codec'), info.get('profile'), info.get('width'), info.get('height'),
+                 info.get('pix_fmt'), info.get('time_base'))
+        if None in video or not info.get('fps'):
+            return None
+        audio = None # Clips without audio only match each other
+        if info.get('has_audio'):
+            audio = (info.get('audio_codec'), info.get('sample_rate'),
+                     info.get('channels'), info.get('channel_layout'))
+            if None in audio:
+                return None
+        return video + (round(info['fps'], 2), audio)
+
+    def _can_stream_copy(self, video_files: List[str], meta: Optional[dict] = None) -> bool:
+        """
+        True when every input has a complete _stream_signature and they are all equal.
+        A file missing from meta, or with any signature field unknown, makes the answer False.
+        """
+        try:
+            if meta is None:
+                meta = {f: self.get_video_info(f) for f in video_files}
+        except Exception:
+            return False
+        signatures = set()
+        for f in video_files:
+            signature = self._stream_signature(meta[f]) if f in meta else None
+            if signature is None:
+                return False
+            signatures.add(signature)
+        return len(signatures) == 1
+
+    def _ffmpeg_concat_copy(self, files: List[str], out: str, faststart: bool = True,
+                            cancel_event: Optional[threading.Event] = None):
+        """Join files with the concat demuxer (-c copy) - a remux, no decode or encode"""
+        fd, list_path = tempfile.mkstemp(suffix='.txt', prefix='concat_')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for file in files:
+                    # Concat list syntax: quote the path and escape embedded single quotes
+                    safe_path = os.path.abspath(file).replace('\\', '/').replace("'", "'\\''")
+                    f.write(f"file '{safe_path}'\n")
+            
+            cmd = [self.ffmpeg_path, '-y', '-hide_banner', '-f', 'concat', '-safe', '0', '-i', list_path,
+                   '-map', '0', '-c', 'copy', *self._movflags(faststart), out]
+            res = self._run_ffmpeg(cmd, cancel_event)
+            if res.returncode != 0:
+                error_details = f"FFmpeg Concat Copy Failed (Exit {res.returncode}).\nError: {res.stderr}"
+                self._log_error(error_details)
+                raise Exception(error_details)
+        finally:
+            try: os.remove(list_path)
+            except: pass
+
+    def _movflags(self, faststart: bool) -> List[str]:
+        """
+        +faststart re-reads and rewrites the finished file to move the index up front.
+        Worth it for files people open; temp blocks are only read back by FFmpeg.
+        """
+        return ['-movflags', '+faststart'] if faststart else []
+
+    def _try_concat_demuxer(self, files: List[str], out: str, meta: dict, faststart: bool = True,
+                            cancel_event: Optional[threading.Event] = None) -> bool:
+        """
+        Stream-copy uniform files into out; False means the caller has to re-encode.
+        Only files whose full signatures (profile, time base, channel layout included) match are remuxed.
+        """
+        if len(files) < 2 or not self._can_stream_copy(files, meta):
+            return False
+        try:
+            self._ffmpeg_concat_copy(files, out, faststart, cancel_event)
+            return True
+        except MergeCancelled:
+            raise
+        except Exception as copy_e:
+            print(f"Block stream copy failed: {copy_e}. Re-encoding block...")
+            return False
 
-    def _ffmpeg_merge_block(self, files: List[str], out: str, preset: str = 'ultrafast', crf: int = 23):
+    def _collect_meta(self, files: List[str]) -> dict:
+        """
+        Probe files up front (in parallel, through the info cache) and return path -> info.
+        Files that can't be probed are left out; FFmpeg reports the real error when it opens them.
+        """
+        self.probe_many(files)
+        meta = {}
+        for f in files:
+            try:
+                meta[f] = self.get_video_info(f)
+            except Exception:
+                pass
+        return meta
+
+    def _ffmpeg_merge_block(self, files: List[str], out: str, meta: dict, preset: str = 'ultrafast',
+                            crf: int = 23, allow_copy: bool = True, faststart: bool = True,
+                            threads: int = 0, safe: bool = False,
+                            cancel_event: Optional[threading.Event] = None,
+                            on_time: Optional[Callable[[float], None]] = None):
         """
         Merges a small list of files using Decoded Concat (Complex Filter)
         Now supports compression tuning.
+        meta: path -> get_video_info() result, collected up front; this method never probes.
+        allow_copy: Try a lossless concat demuxer remux first when the files share one encoding.
+        faststart: Move the moov index to the front (skip for temp files; it costs a rewrite pass).
+        threads: CPU threads this encode may use (0 = all cores); ignored in potato mode.
+        safe: CPU-only, single-threaded encode with a deep muxing queue (fallback path).
+        cancel_event: Stops FFmpeg and raises MergeCancelled as soon as it is set.
+        on_time: Receives the encode's output position in seconds while it runs.
         """
-        inputs = []
-        filter_parts = []
+        if allow_copy and self._try_concat_demuxer(files, out, meta, faststart, cancel_event):
+            return
         
+        w, h = self.target_width, self.target_height
+        audio_filters = []
+        silent = [] # (input index, duration) of clips without an audio stream
         for i, file in enumerate(files):
-            inputs.extend(['-i', file])
-            
-            info = self.get_video_info(file)
-            duration = info.get('duration', 1.0)
-            has_audio = self._has_audio(file)
-            
-            v_filter = (f"[{i}:v]scale={self.target_width}:{self.target_height}:force_original_aspect_ratio=decrease,"
-                        f"pad={self.target_width}:{self.target_height}:(ow-iw)/2:(oh-ih)/2,setsar=1[v{i}]")
-            filter_parts.append(v_filter)
-            
-            if has_audio:
-                a_filter = f"[{i}:a]aresample=44100,aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo[a{i}]"
+            info = meta.get(file, {})
+            if info.get('has_audio'):
+                audio_filters.append(f"[{i}:a]aresample=44100,aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo[a{i}]")
             else:
-                a_filter = f"anullsrc=channel_layout=stereo:sample_rate=44100:d={duration}[a{i}]"
-            
-            filter_parts.append(a_filter)
+                silent.append((i, info.get('duration') or 1.0))
+        
+        if len(silent) == 1 or self.potato_mode:
+            # asplit queues silence for the later clips while concat plays the earlier ones,
+            # so low-RAM modes keep a bounded generator per clip
+            for i, duration in silent:
+                audio_filters.append(f"anullsrc=channel_layout=stereo:sample_rate=44100:d={duration}[a{i}]")
+        elif silent:
+            # One silence generator for the whole block, split and trimmed to each clip
+            split_outs = "".join(f"[sil{i}]" for i, _ in silent)
+            audio_filters.append(f"anullsrc=channel_layout=stereo:sample_rate=44100[sil];[sil]asplit={len(silent)}{split_outs}")
+            for i, duration in silent:
+                audio_filters.append(f"[sil{i}]atrim=0:{duration},asetpts=PTS-STARTPTS[a{i}]")
 
         concat_in = "".join([f"[v{j}][a{j}]" for j in range(len(files))])
         concat_cmd = f"{concat_in}concat=n={len(files)}:v=1:a=1[vout][aout]"
-        filter_parts.append(concat_cmd)
-        
-        full_filter = ";".join(filter_parts)
         
         # Final encoding settings
         final_preset = 'ultrafast' if self.potato_mode else preset
         
         # Level 2+ Poverty Optimizations
-        thread_args = ['-threads', str(self.max_threads)] if self.max_threads > 0 else []
-        io_args = ['-max_muxing_queue_size', '1024'] if self.performance_level >= 2 else []
+        # '-threads' sizes the encoder only as an output option (after the inputs, before out);
+        # in front of an '-i' it would just set that input's decoder threads.
+        # '-filter_complex_threads' is global and stays up front.
+        if safe:
+            thread_args = ['-filter_complex_threads', '1']
+            encoder_thread_args = ['-threads', '1']
+        elif self.max_threads > 0:
+            thread_args = []
+            encoder_thread_args = ['-threads', str(self.max_threads)]
+        elif not self.potato_mode:
+            # The filter graph (scale/pad/aresample per input) runs on one thread by default
+            threads = threads or os.cpu_count() or 1
+            thread_args = ['-filter_complex_threads', str(max(2, threads // 2))]
+            encoder_thread_args = ['-threads', str(threads)]
+        else:
+            thread_args = []
+            encoder_thread_args = []
+        if safe:
+            io_args = ['-max_muxing_queue_size', '4096']
+        else:
+            io_args = ['-max_muxing_queue_size', '1024'] if self.performance_level >= 2 else []
         
-        cmd = [self.ffmpeg_path, '-y', '-hide_banner'] + thread_args + inputs + [
-            '-filter_complex', full_filter,
-            '-map', '[vout]', '-map', '[aout]',
-            '-c:v', 'libx264', '-preset', final_preset, '-crf', str(crf), 
-            '-c:a', 'aac', '-b:a', '128k',
-            *io_args,
-            '-movflags', '+faststart',
-            out
-        ]
+        def build_cmd(mode: str) -> List[str]:
+            """
+            mode 'cuda': decode, scale/pad and encode without frames leaving VRAM
+            mode 'hw': hardware encode (NVENC also decodes on the GPU), CPU filters
+            mode 'software': CPU decode, filters and libx264
+            """
+            nvenc = mode != 'software' and self.gpu_codec.endswith('_nvenc')
+            if mode == 'cuda':
+                hw_decode = ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda']
+                v_filters = [f"[{i}:v]scale_cuda={w}:{h}:force_original_aspect_ratio=decrease,"
+                             f"pad_cuda={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1[v{i}]" for i in range(len(files))]
+            else:
+                hw_decode = ['-hwaccel', 'cuda'] if nvenc else []
+                v_filters = [f"[{i}:v]scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                             f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1[v{i}]" for i in range(len(files))]
+            
+            inputs = []
+            for file in files:
+                inputs.extend(hw_decode + ['-i', file])
+            full_filter = ";".join(v_filters + audio_filters + [concat_cmd])
+            filter_args = ['-filter_complex', full_filter]
+            if len(full_filter) > self.FILTER_SCRIPT_CHARS:
+                # Keep big graphs off the command line
+                fd, script_path = tempfile.mkstemp(suffix='.txt', prefix='filter_')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(full_filter)
+                scripts.append(script_path)
+                filter_args = ['-filter_complex_script', script_path]
+            return [self.ffmpeg_path, '-y', '-hide_banner'] + thread_args + inputs + filter_args + [
+                '-map', '[vout]', '-map', '[aout]',
+                *self._video_codec_args(final_preset, crf, software=(mode == 'software')),
+                *encoder_thread_args,
+                '-c:a', 'aac', '-b:a', '128k',
+                *io_args,
+                *self._movflags(faststart),
+                out
+            ]
         
-        si = self._get_startupinfo()
-        res = subprocess.run(cmd, capture_output=True, text=True, startupinfo=si)
+        # Most to least accelerated; each failure falls through to the next
+        modes = []
+        if self.use_gpu and not safe:
+            if self.gpu_codec.endswith('_nvenc') and self._cuda_filters_ok:
+                modes.append('cuda')
+            modes.append('hw')
+        modes.append('software')
+        
+        scripts = []
+        permanent = set() # Accelerated modes that failed in a way a retry can't fix
+        try:
+            for mode in modes:
+                res = self._run_ffmpeg(build_cmd(mode), cancel_event, on_time)
+                if res.returncode == 0:
+                    break
+                if mode != 'software':
+                    # e.g. an FFmpeg build without pad_cuda, an input NVDEC can't decode,
+                    # "No NVENC capable devices found" or the driver's session limit
+                    self._log_error(f"FFmpeg {mode} pipeline failed ({self.gpu_codec}), retrying with less acceleration.\nError: {res.stderr}")
+                    if any(marker in (res.stderr or '') for marker in _PERMANENT_GPU_ERRORS):
+                        permanent.add(mode)
+        finally:
+            for script_path in scripts:
+                try: os.remove(script_path)
+                except: pass
+        
+        # Don't repeat a pipeline that can never work for every block of the session;
+        # a transient failure (e.g. our own parallel blocks filling the NVENC sessions) only costs this block
+        if permanent:
+            with self._gpu_state_lock:
+                if 'cuda' in permanent:
+                    self._cuda_filters_ok = False
+                if 'hw' in permanent and self.use_gpu:
+                    print(f"{self.gpu_codec} unusable - using CPU encoding for the rest of this session")
+                    self.use_gpu = False
         if res.returncode != 0:
             # Provide more helpful debug info in the exception
             error_details = f"FFmpeg Block Failed (Exit {res.returncode}).\nError: {res.stderr}"
@@ -325,161 +974,338 @@ class RobustVideoMerger:
         except:
             pass
 
-    def _has_audio(self, path: str) -> bool:
-        """Robustly check if file contains an audio stream using ffprobe"""
-        try:
-            si = self._get_startupinfo()
-            cmd = ['ffprobe', '-v', 'error', '-select_streams', 'a', '-show_entries', 'stream=codec_type', '-of', 'csv=p=0', path]
-            res = subprocess.run(cmd, capture_output=True, text=True, startupinfo=si)
-            # If output contains 'audio', it has an audio stream
-            return "audio" in res.stdout.strip().lower()
-        except:
-            return False
-
-    def _merge_with_moviepy(self, video_files: List[str], output_path: str,
-                           progress_callback: Optional[Callable[[int, str], None]] = None) -> bool:
+    def _merge_safe_mode(self, video_files: List[str], output_path: str,
+                         progress_callback: Optional[Callable[[int, str], None]] = None,
+                         cancel_event: Optional[threading.Event] = None) -> bool:
         """
-        Fallback merge using MoviePy with improved robustness
+        Last-resort merge that stays on FFmpeg but plays it safe:
+        one clip per process, CPU encoder, single thread and a deep muxing queue.
+        Each clip is normalized on its own and the results are remuxed together.
         """
-        from moviepy.editor import VideoFileClip, concatenate_videoclips
-        try:
-            from moviepy.audio.AudioClip import AudioClip
-            from moviepy.editor import CompositeVideoClip
-        except ImportError:
-            pass
-
-        clips = []
+        temp_files = []
         total_files = len(video_files)
-        
+        tmpdir = tempfile.mkdtemp(prefix='vmp_safe_')
         try:
-            if progress_callback:
-                progress_callback(10, "Loading videos with Internal Engine...")
-            
-            # Load and process each video
+            meta = self._collect_meta(video_files)
             for i, video_path in enumerate(video_files):
                 if progress_callback:
-                    progress = 10 + int((i / total_files) * 60)
-                    progress_callback(progress, f"Processing video {i+1}/{total_files} (internal engine)")
+                    progress = 10 + int((i / total_files) * 80)
+                    progress_callback(progress, f"Processing video {i+1}/{total_files} (safe mode)")
                 
                 if not os.path.exists(video_path):
                     raise FileNotFoundError(f"Video file not found: {video_path}")
                 
-                # Load video clip
-                clip = VideoFileClip(video_path)
-                
-                # 1. HANDLE DIMENSIONS
-                if clip.w != self.target_width or clip.h != self.target_height:
-                    scale = min(self.target_width / clip.w, self.target_height / clip.h)
-                    new_w, new_h = int(clip.w * scale), int(clip.h * scale)
-                    clip = clip.resize((new_w, new_h))
-                    clip = CompositeVideoClip([clip.set_position("center")], 
-                                            size=(self.target_width, self.target_height),
-                                            bg_color=(0,0,0))
-                
-                # 2. HANDLE FPS
-                clip = clip.set_fps(self.target_fps)
-
-                # 3. HANDLE AUDIO
-                if clip.audio is None:
-                    # Fix: MoviePy AudioClip needs a duration and a make_frame
-                    from moviepy.audio.AudioClip import AudioArrayClip
-                    import numpy as np
-                    # Create 1 second of silence then clip it to video duration
-                    silent_data = np.zeros((int(clip.duration * 44100), 2))
-                    silent_audio = AudioArrayClip(silent_data, fps=44100)
-                    clip = clip.set_audio(silent_audio)
-                
-                clips.append(clip)
-            
-            if progress_callback:
-                progress_callback(80, "Merging videos...")
-            
-            final_video = concatenate_videoclips(clips, method="compose")
+                temp_output = os.path.join(tmpdir, f"clip_{i}_{uuid.uuid4().hex}.mp4")
+                temp_files.append(temp_output)
+                self._ffmpeg_merge_block([video_path], temp_output, meta, preset='medium', crf=23,
+                                         allow_copy=False, faststart=False, safe=True,
+                                         cancel_event=cancel_event)
             
             if progress_callback:
-                progress_callback(90, "Encoding final video...")
-            
-            final_video.write_videofile(
-                output_path,
-                codec=self.codec,
-                audio_codec=self.audio_codec,
-                fps=self.target_fps,
-                verbose=False,
-                logger=None,
-                threads=4
-            )
-            
-            for clip in clips: clip.close()
-            final_video.close()
+                progress_callback(90, "Merging videos...")
+            if len(temp_files) == 1:
+                shutil.move(temp_files[0], output_path)
+            else:
+                self._ffmpeg_concat_copy(temp_files, output_path, cancel_event=cancel_event)
             return True
-            
-        except Exception as e:
-            for clip in clips:
-                try: clip.close()
-                except: pass
-            raise e
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
 
     def validate_video_files(self, video_files: List[str]) -> List[str]:
-        invalid_files = []
-        for video_path in video_files:
-            if not os.path.exists(video_path):
-                invalid_files.append(f"{video_path} (not found)")
+        """
+        Cheap pre-flight check: every path must be a non-empty regular file.
+        The stats run side by side (network shares answer slowly); anything FFmpeg can't
+        decode surfaces when the merge opens it. VIDEOMERGER_STRICT_VALIDATE=1 also probes each file.
+        """
+        if not video_files:
+            return []
+        with ThreadPoolExecutor(max_workers=min(16, len(video_files))) as pool:
+            problems = list(pool.map(self._file_problem, video_files))
+        invalid_files = [f"{path} ({problem})" for path, problem in zip(video_files, problems) if problem]
+        
+        if not invalid_files and os.environ.get('VIDEOMERGER_STRICT_VALIDATE') == '1':
+            self.probe_many(video_files)
+            for video_path in video_files:
+                try:
+                    self.get_video_info(video_path)
+                except Exception:
+                    invalid_files.append(f"{video_path} (unreadable)")
         return invalid_files
 
+    def _file_problem(self, path: str) -> Optional[str]:
+        """Why path can't be merged as far as one os.stat can tell, or None"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return "not found"
+        if not stat.S_ISREG(st.st_mode):
+            return "not a file"
+        if st.st_size == 0:
+            return "empty"
+        return None
+
+    def _find_ffprobe(self) -> Optional[str]:
+        """Locate ffprobe next to the bundled ffmpeg, falling back to PATH"""
+        ffmpeg_dir = os.path.dirname(self.ffmpeg_path)
+        for name in ('ffprobe.exe', 'ffprobe'):
+            candidate = os.path.join(ffmpeg_dir, name)
+            if os.path.exists(candidate):
+                return candidate
+        return shutil.which('ffprobe')
+
+    def cached_video_info(self, video_path: str) -> Optional[dict]:
+        """
+        Metadata for an unchanged file without probing it, or None.
+        Checks this session's memo first, then the persistent metadata_cache; costs one os.stat.
+        """
+        st = os.stat(video_path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._info_cache.get(video_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        if self.metadata_cache is not None:
+            try:
+                info = self.metadata_cache.get(MetadataCache.make_key(video_path, st))
+            except Exception:
+                info = None # A locked or damaged cache only costs a probe
+            if info is not None:
+                self._info_cache[video_path] = (key, info)
+                return info
+        return None
+
+    def _remember_info(self, video_path: str, info: dict):
+        """Store a fresh probe in the session memo and the persistent cache"""
+        st = os.stat(video_path)
+        self._info_cache[video_path] = ((st.st_mtime_ns, st.st_size), info)
+        if self.metadata_cache is not None:
+            try:
+                self.metadata_cache.put(MetadataCache.make_key(video_path, st), info)
+            except Exception:
+                pass
+
+    def _is_cached(self, video_path: str) -> bool:
+        try:
+            return self.cached_video_info(video_path) is not None
+        except OSError:
+            return False # Missing files are left to get_video_info to report
+
+    def clear_info_cache(self):
+        """Forget every remembered probe, in memory and on disk"""
+        self._info_cache.clear()
+        if self.metadata_cache is not None:
+            self.metadata_cache.clear_cache()
+
     def get_video_info(self, video_path: str) -> dict:
+        """
+        Read container metadata, memoized per file.
+        The ffprobe spawn dominates the cost, so each clip is probed once
+        (and, with a metadata_cache, once across sessions) no matter how many
+        times batching, stream-copy checks and blocks ask for it.
+        """
         if not os.path.exists(video_path): raise FileNotFoundError(video_path)
+        info = self.cached_video_info(video_path)
+        if info is None:
+            info = self._probe_video_info(video_path)
+            self._remember_info(video_path, info)
+        return info
+
+    @property
+    def groups_probes(self) -> bool:
+        """True when only ffmpeg can probe, so several files should share one spawn"""
+        return av is None and not self.ffprobe_path
+
+    def probe_many(self, video_paths: List[str]):
+        """
+        Fill the info cache for every uncached path up front.
+        Without PyAV or ffprobe, ffmpeg reads a whole group per spawn; otherwise the
+        per-file probes run side by side.
+        """
+        missing = [p for p in dict.fromkeys(video_paths) if not self._is_cached(p)]
+        if not missing:
+            return
+        
+        # Probes wait on process startup and disk, not the CPU, so oversubscribe the cores
+        workers = min(32, (os.cpu_count() or 1) * 4) if self.performance_level < 2 else 1
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+            if self.groups_probes and len(missing) > 1:
+                groups = [missing[i : i + self.PROBE_GROUP_SIZE]
+                          for i in range(0, len(missing), self.PROBE_GROUP_SIZE)]
+                for future in [pool.submit(self.get_video_info_batch, g) for g in groups]:
+                    try:
+                        future.result()
+                    except Exception:
+                        pass # Probed one by one below
+                missing = [p for p in missing if not self._is_cached(p)]
+            
+            for future in [pool.submit(self.get_video_info, p) for p in missing]:
+                try:
+                    future.result()
+                except Exception:
+                    pass # Unreadable files surface their error when the merge asks for them
+
+    def _probe_video_info(self, video_path: str) -> dict:
+        """
+        Read container metadata in-process with PyAV when it is installed, else with a single ffprobe call.
+        Falls back to parsing the ffmpeg -i banner when ffprobe is missing or fails,
+        which is still a header read rather than a full decode.
+        """
+        if av is not None:
+            try:
+                return self._probe_with_pyav(video_path)
+            except Exception:
+                pass # Let ffprobe/ffmpeg have a go at containers PyAV rejects
+        if not self.ffprobe_path:
+            return self._get_video_info_via_ffmpeg(video_path)
         try:
-                si = self._get_startupinfo()
-                thread_args = ['-threads', '1'] if self.performance_level >= 2 else []
-                # Fallback to ffmpeg -i parsing if ffprobe is missing
-                ffprobe_path = os.path.join(os.path.dirname(self.ffmpeg_path), 'ffprobe.exe')
-                
-                if os.path.exists(ffprobe_path):
-                    cmd = [ffprobe_path, '-v', 'quiet', '-print_format', 'json'] + thread_args + ['-show_format', '-show_streams', video_path]
-                    res = subprocess.run(cmd, capture_output=True, text=True, startupinfo=si)
-                    data = json.loads(res.stdout)
-                    v_stream = next((s for s in data['streams'] if s['codec_type'] == 'video'), {})
-                    return {
-                        'filename': os.path.basename(video_path),
-                        'duration': float(data['format'].get('duration', 0)),
-                        'fps': eval(v_stream.get('r_frame_rate', '0/1')),
-                        'width': int(v_stream.get('width', 0)),
-                        'height': int(v_stream.get('height', 0)),
-                        'file_size': int(data['format'].get('size', 0))
-                    }
-                else:
-                    return self._get_video_info_via_ffmpeg(video_path)
-        except Exception as e:
-            # Fallback to moviepy only if not Level 2
-            if self.performance_level < 2:
-                from moviepy.editor import VideoFileClip
-                clip = VideoFileClip(video_path)
-                info = {'filename': os.path.basename(video_path), 'duration': clip.duration, 'width': clip.w, 'height': clip.h, 'file_size': os.path.getsize(video_path)}
-                clip.close()
-                return info
+            si = self._si
+            thread_args = ['-threads', '1'] if self.performance_level >= 2 else []
+            cmd = [self.ffprobe_path, '-v', 'error', '-print_format', 'json'] + thread_args + ['-show_format', '-show_streams', video_path]
+            res = subprocess.run(cmd, capture_output=True, text=True, startupinfo=si)
+            data = json.loads(res.stdout)
+            v_stream = next((s for s in data['streams'] if s['codec_type'] == 'video'), {})
+            a_stream = next((s for s in data['streams'] if s['codec_type'] == 'audio'), {})
+            return {
+                'filename': os.path.basename(video_path),
+                'duration': float(data['format'].get('duration', 0)),
+                'fps': self._parse_frame_rate(v_stream.get('r_frame_rate', '0/1')),
+                'width': int(v_stream.get('width', 0)),
+                'height': int(v_stream.get('height', 0)),
+                'file_size': int(data['format'].get('size', 0)),
+                'codec': v_stream.get('codec_name'),
+                'pix_fmt': v_stream.get('pix_fmt'),
+                'profile': v_stream.get('profile'),
+                'time_base': v_stream.get('time_base'),
+                'has_audio': bool(a_stream),
+                'audio_codec': a_stream.get('codec_name'),
+                'sample_rate': int(a_stream.get('sample_rate', 0)) or None,
+                'channels': a_stream.get('channels'),
+                'channel_layout': a_stream.get('channel_layout')
+            }
+        except Exception:
+            # ffprobe could not read this file - the ffmpeg banner parser is more forgiving
+            return self._get_video_info_via_ffmpeg(video_path)
+
+    def _probe_with_pyav(self, video_path: str) -> dict:
+        """Same fields as the ffprobe probe, read through libavformat without a subprocess"""
+        with av.open(video_path) as container:
+            v_stream = container.streams.video[0] if container.streams.video else None
+            a_stream = container.streams.audio[0] if container.streams.audio else None
+            if container.duration:
+                duration = container.duration / av.time_base
+            elif v_stream is not None and v_stream.duration:
+                duration = float(v_stream.duration * v_stream.time_base)
             else:
-                raise e
+                duration = 0.0
+            v_ctx = v_stream.codec_context if v_stream is not None else None
+            a_ctx = a_stream.codec_context if a_stream is not None else None
+            rate = (v_stream.guessed_rate or v_stream.average_rate) if v_stream is not None else None
+            time_base = v_stream.time_base if v_stream is not None else None
+            return {
+                'filename': os.path.basename(video_path),
+                'duration': float(duration),
+                'fps': float(rate) if rate else 0.0,
+                'width': v_ctx.width if v_ctx else 0,
+                'height': v_ctx.height if v_ctx else 0,
+                'file_size': os.path.getsize(video_path),
+                'codec': v_ctx.name if v_ctx else None,
+                'pix_fmt': v_ctx.pix_fmt if v_ctx else None,
+                'profile': v_ctx.profile if v_ctx else None,
+                'time_base': f"{time_base.numerator}/{time_base.denominator}" if time_base else None,
+                'has_audio': a_stream is not None,
+                'audio_codec': a_ctx.name if a_ctx else None,
+                'sample_rate': (a_ctx.sample_rate or None) if a_ctx else None,
+                'channels': (a_ctx.channels or None) if a_ctx else None,
+                'channel_layout': a_ctx.layout.name if a_ctx else None
+            }
+
+    def _parse_frame_rate(self, rate: str) -> float:
+        """Turn ffprobe's "30000/1001" style rate into a float (0.0 if unknown)"""
+        try:
+            num, _, den = rate.partition('/')
+            return int(num) / int(den) if den and int(den) else float(num)
+        except ValueError:
+            return 0.0
+
+    def get_video_info_batch(self, video_paths: List[str]) -> dict:
+        """
+        Probe several files with a single ffmpeg process.
+        ffmpeg prints an "Input #n" block for every -i before complaining that no
+        output was given, so one spawn yields metadata for the whole group.
+        Returns path -> info; files that could not be parsed are left out so the
+        caller can probe them individually.
+        """
+        paths = [p for p in video_paths if os.path.exists(p)]
+        if not paths:
+            return {}
+        
+        si = self._si
+        cmd = [self.ffmpeg_path, '-hide_banner']
+        for path in paths:
+            cmd.extend(['-i', path])
+        res = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8',
+                             errors='replace', startupinfo=si)
+        
+        # ffmpeg stops at the first unreadable input, so only the leading inputs may be present
+        results = {}
+        sections = _INPUT_SPLIT_RE.split(res.stderr)
+        for idx_str, section in zip(sections[1::2], sections[2::2]):
+            idx = int(idx_str)
+            if idx < len(paths):
+                path = paths[idx]
+                results[path] = self._parse_ffmpeg_banner(path, section)
+                self._remember_info(path, results[path])
+        return results
 
     def _get_video_info_via_ffmpeg(self, video_path: str) -> dict:
         """Fallback info parser using ffmpeg -i (No ffprobe required)"""
-        si = self._get_startupinfo()
+        si = self._si
         cmd = [self.ffmpeg_path, '-i', video_path]
         res = subprocess.run(cmd, capture_output=True, text=True, startupinfo=si)
         output = res.stderr # ffmpeg outputs info to stderr
-        
+        return self._parse_ffmpeg_banner(video_path, output)
+
+    def _parse_ffmpeg_banner(self, video_path: str, output: str) -> dict:
+        """Extract duration and resolution from the input dump ffmpeg writes to stderr"""
         info = {'filename': os.path.basename(video_path), 'duration': 0, 'width': 1920, 'height': 1080}
         
         # Duration match
-        dur_match = re.search(r"Duration:\s(\d+):(\d+):(\d+\.\d+)", output)
+        dur_match = _DUR_RE.search(output)
         if dur_match:
             h, m, s = map(float, dur_match.groups())
             info['duration'] = h * 3600 + m * 60 + s
             
         # Resolution match
-        res_match = re.search(r"Video:.*?\s(\d+)x(\d+)", output)
+        res_match = _RES_RE.search(output)
         if res_match:
             info['width'] = int(res_match.group(1))
             info['height'] = int(res_match.group(2))
+        
+        # Codec / pixel format / fps, e.g. "Video: h264 (High) (avc1 / 0x31637661), yuv420p(tv), ... 30 fps"
+        codec_match = _CODEC_RE.search(output)
+        if codec_match:
+            info['codec'], info['pix_fmt'] = codec_match.groups()
+        fps_match = _FPS_RE.search(output)
+        if fps_match:
+            info['fps'] = float(fps_match.group(1))
+        profile_match = _PROFILE_RE.search(output) # "(High)"; a bare "(avc1 / 0x...)" tag is not a profile
+        info['profile'] = profile_match.group(1) if profile_match else None
+        tbn_match = _TBN_RE.search(output) # "15360 tbn" / "90k tbn" = a 1/15360 or 1/90000 time base
+        info['time_base'] = None
+        if tbn_match:
+            tbn = float(tbn_match.group(1)) * (1000 if tbn_match.group(2) else 1)
+            info['time_base'] = f"1/{int(tbn)}" if tbn.is_integer() else None
+        
+        # Audio, e.g. "Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, stereo"
+        audio_match = _AUDIO_RE.search(output)
+        info['has_audio'] = audio_match is not None
+        info['audio_codec'] = audio_match.group(1) if audio_match else None
+        info['sample_rate'] = int(audio_match.group(2)) if audio_match else None
+        layout = audio_match.group(3).strip() if audio_match and audio_match.group(3) else None
+        channel_count = _CHANNELS_RE.fullmatch(layout or "")
+        if channel_count:
+            info['channels'], info['channel_layout'] = int(channel_count.group(1)), None # No named layout
+        else:
+            info['channels'], info['channel_layout'] = _LAYOUT_CHANNELS.get(layout), layout
             
         info['file_size'] = os.path.getsize(video_path)
-        return info
\ No newline at end of file
+        return info
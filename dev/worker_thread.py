@@ -4,14 +4,57 @@ Handles video merging in a separate thread to keep the UI responsive
 Provides progress updates and error handling
 """
 
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QThread, QThreadPool, QObject, QRunnable, pyqtSignal
 import os
-import json
-import urllib.request
-import traceback
-from typing import List
+import functools
+import sys
+import string
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
 
-from video_merger_robust import RobustVideoMerger
+from video_merger_robust import RobustVideoMerger, MergeCancelled
+
+# Compilation titles keep letters, digits, space, '-' and '_'; every other ASCII char is dropped
+_TITLE_KEEP = frozenset(string.ascii_letters + string.digits + " -_")
+_TITLE_DROP = {c: None for c in range(128) if chr(c) not in _TITLE_KEEP}
+
+
+def _format_literal(text: str) -> str:
+    """Escape text for use as the fixed part of a str.format template"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def sanitize_title(title: str) -> str:
+    """File-name-safe version of a title; str.translate strips ASCII in C, non-ASCII is rare"""
+    cleaned = title.translate(_TITLE_DROP)
+    if not cleaned.isascii():
+        cleaned = "".join(c for c in cleaned if c.isalnum() or c in _TITLE_KEEP)
+    return cleaned.strip()
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_batches(video_merger: RobustVideoMerger, files: tuple, durations: Optional[tuple],
+                    max_duration: float, max_clip_count: int, standalone_threshold: float) -> tuple:
+    """
+    calculate_batches memoized per file list and settings (a retry skips the whole pass)
+    durations: Per-file seconds in files order, or None to let the engine probe
+    """
+    batches = video_merger.calculate_batches(
+        list(files),
+        max_duration_sec=max_duration,
+        max_clip_count=max_clip_count,
+        cached_durations=dict(zip(files, durations)) if durations is not None else None,
+        standalone_threshold_sec=standalone_threshold
+    )
+    return tuple(tuple(batch) for batch in batches) # Immutable - cached results are shared
+
+
+def clear_batch_cache():
+    """Forget memoized batch plans (call when the file list or its metadata changes)"""
+    _cached_batches.cache_clear()
 
 
 class VideoMergerWorker(QThread):
@@ -24,11 +67,12 @@ class VideoMergerWorker(QThread):
     progress_updated = pyqtSignal(int)  # Progress percentage (0-100)
     status_updated = pyqtSignal(str)    # Status message
     merge_completed = pyqtSignal(str)   # Output file path on success
-    merge_failed = pyqtSignal(str)      # Error message on failure
+    merge_failed = pyqtSignal(str, object)  # Error message, sys.exc_info() tuple or None
     
     def __init__(self, video_files: List[str], output_path: str, video_merger: RobustVideoMerger, 
                  max_duration: float = 0, max_clip_count: int = 0, auto_naming: bool = True,
-                 comp_title: str = "Merge", standalone_threshold: float = 0):
+                 comp_title: str = "Merge", standalone_threshold: float = 0, parallel_batches: bool = False,
+                 durations: Optional[dict] = None):
         """
         Initialize the worker thread
         
@@ -41,6 +85,8 @@ class VideoMergerWorker(QThread):
             auto_naming: Whether to use the clip-X-Y naming format.
             comp_title: Custom title for the compilation.
             standalone_threshold: Videos longer than this will be standalone (in seconds).
+            parallel_batches: Merge several output parts at once (Normal performance level only).
+            durations: Optional path -> seconds already probed by the GUI, so batching spawns no ffprobe.
         """
         super().__init__()
         
@@ -52,7 +98,16 @@ class VideoMergerWorker(QThread):
         self.auto_naming = auto_naming
         self.comp_title = comp_title
         self.standalone_threshold = standalone_threshold
-        self._is_cancelled = False
+        self.parallel_batches = parallel_batches
+        self.durations = durations
+        self._cancel_event = threading.Event() # Also seen by merge_videos, which stops FFmpeg on it
+        self._last_pct = -1       # Last progress value emitted
+        self._last_status = None  # Last status text emitted
+        self._last_emit_ns = 0    # When either was last emitted
+        self._batch_progress = [] # Per-part progress (0-100), summed for the overall bar
+        self._progress_lock = threading.Lock() # Parts may report from several threads
+    
+    PROGRESS_INTERVAL_NS = 50_000_000  # 50 ms
     
     def run(self):
         """
@@ -60,32 +115,45 @@ class VideoMergerWorker(QThread):
         Performs video validation and merging with progress updates
         """
         
+        # This thread only waits on FFmpeg and relays progress; the GUI thread comes first
+        self.setPriority(QThread.LowPriority)
+        
         try:
             # Emit initial status
             self.status_updated.emit("Validating video files...")
             self.progress_updated.emit(0)
             
-            # Validate all video files before processing
-            invalid_files = self.video_merger.validate_video_files(self.video_files)
+            # Validate all video files before processing; a clip added twice is checked once
+            # (the merge still uses every occurrence)
+            unique_files = list(dict.fromkeys(self.video_files))
+            if len(unique_files) < len(self.video_files):
+                print(f"Validating {len(unique_files)} unique files ({len(self.video_files) - len(unique_files)} repeats skipped)")
+            invalid_files = self.video_merger.validate_video_files(unique_files)
             
             if invalid_files:
                 error_msg = "Invalid video files found:\n" + "\n".join(invalid_files)
-                self.merge_failed.emit(error_msg)
+                self.merge_failed.emit(error_msg, None)
                 return
             
-            if self._is_cancelled:
+            if self._cancel_event.is_set():
                 return
             
             # Step 1: Calculate batches if splitting is enabled
             batches = []
             if self.max_duration > 0 or self.max_clip_count > 0 or self.standalone_threshold > 0:
                 self.status_updated.emit("Calculating batches...")
-                batches = self.video_merger.calculate_batches(
-                    self.video_files, 
-                    max_duration_sec=self.max_duration, 
-                    max_clip_count=self.max_clip_count,
-                    standalone_threshold_sec=self.standalone_threshold
-                )
+                files = tuple(self.video_files)
+                durations = None
+                if self.durations is not None:
+                    durations = tuple(self.durations.get(path, 0) or 0 for path in files)
+                batches = [list(batch) for batch in _cached_batches(
+                    self.video_merger,
+                    files,
+                    durations,
+                    self.max_duration,
+                    self.max_clip_count,
+                    self.standalone_threshold
+                )]
             else:
                 batches = [self.video_files]
             
@@ -94,68 +162,72 @@ class VideoMergerWorker(QThread):
             # If only 1 batch, just use original output path
             # If multiple, key them _part1, _part2, etc.
             
-            generated_files = []
+            # Loop invariants: clip positions for the clip-X-Y names and one path template per naming
+            # scheme (literal braces in the user's path are escaped for str.format)
+            pos = {path: i for i, path in enumerate(self.video_files)}
+            base, ext = (_format_literal(part) for part in os.path.splitext(self.output_path))
+            folder = _format_literal(os.path.dirname(self.output_path))
+            safe_title = sanitize_title(self.comp_title) or "Project"
+            auto_fmt = os.path.join(folder, f"{safe_title} clip-{{start}}-{{end}} merge {{n}}{ext}")
+            part_fmt = f"{base}_part{{n}}{ext}"
             
+            generated_files = []
             for index, batch_files in enumerate(batches):
-                if self._is_cancelled:
-                    return
-
                 # Determine output filename for this batch
                 current_output_path = self.output_path
                 if total_batches > 1:
-                    base, ext = os.path.splitext(self.output_path)
-                    folder = os.path.dirname(self.output_path)
-                    filename = os.path.basename(self.output_path)
-                    
                     if self.auto_naming:
                         # Find the range of clips in this batch relative to original list
-                        start_idx = self.video_files.index(batch_files[0]) + 1
-                        end_idx = self.video_files.index(batch_files[-1]) + 1
+                        start_idx = pos[batch_files[0]] + 1
+                        end_idx = pos[batch_files[-1]] + 1
                         
                         # [Title] clip-1-40 merge 1.mp4
-                        safe_title = "".join([c for c in self.comp_title if c.isalnum() or c in (' ', '-', '_')]).strip()
-                        if not safe_title: safe_title = "Project"
-                        new_name = f"{safe_title} clip-{start_idx}-{end_idx} merge {index+1}{ext}"
-                        current_output_path = os.path.join(folder, new_name)
+                        current_output_path = auto_fmt.format(start=start_idx, end=end_idx, n=index+1)
                     else:
-                        current_output_path = f"{base}_part{index+1}{ext}"
-                
-                batch_number = index + 1
-                
-                # Update status
-                if total_batches > 1:
-                    self.status_updated.emit(f"Processing Part {batch_number}/{total_batches} ({len(batch_files)} clips)...")
-                else:
-                    self.status_updated.emit("Starting video merge process...")
-                
-                # Define progress callback function specifically for this batch
-                def progress_callback(prog: int, status: str):
-                    if not self._is_cancelled:
-                        # Map 0-100 of this batch to overall progress
-                        # e.g. Batch 1 is 0-50%, Batch 2 is 50-100%
-                        overall_progress = int(((index + (prog / 100)) / total_batches) * 100)
-                        self.progress_updated.emit(overall_progress)
-                        
-                        # Use detailed status if multiple batches
-                        if total_batches > 1:
-                            self.status_updated.emit(f"[Part {batch_number}/{total_batches}] {status}")
-                        else:
-                            self.status_updated.emit(status)
-                
-                # Start the video merge process for this batch
-                success = self.video_merger.merge_videos(
-                    video_files=batch_files,
-                    output_path=current_output_path,
-                    progress_callback=progress_callback
-                )
-                
-                if not success:
-                    self.merge_failed.emit(f"Failed to process part {batch_number}")
-                    return
-                
+                        current_output_path = part_fmt.format(n=index+1)
                 generated_files.append(current_output_path)
             
-            if self._is_cancelled:
+            self._batch_progress = [0] * total_batches
+            workers = self._batch_workers(total_batches)
+            if workers > 1:
+                # Parts share no clips and no output, so several can merge at once
+                self.status_updated.emit(f"Processing {total_batches} parts, {workers} at a time...")
+                failure = None   # merge_failed arguments for the first part that failed
+                aborting = False # True once that failure (not the user) stopped the other parts
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {executor.submit(self._run_single_batch, index, batch_files,
+                                               generated_files[index], total_batches, workers): index
+                               for index, batch_files in enumerate(batches)}
+                    for future in as_completed(futures):
+                        try:
+                            if future.result() or failure is not None:
+                                continue
+                            failure = (f"Failed to process part {futures[future] + 1}", None)
+                        except MergeCancelled:
+                            continue # Stopped by a cancel or by a sibling's failure
+                        except Exception as e:
+                            if failure is not None:
+                                continue
+                            failure = (f"An error occurred during video processing:\n\n{str(e)}", sys.exc_info())
+                        if not self._cancel_event.is_set():
+                            # Terminate the sibling FFmpegs now; parts not started yet are dropped
+                            aborting = True
+                            self._cancel_event.set()
+                            for pending in futures:
+                                pending.cancel()
+                # The executor has shut down, so no FFmpeg of this merge is still writing
+                if aborting:
+                    self.merge_failed.emit(*failure)
+                    return
+            else:
+                for index, batch_files in enumerate(batches):
+                    if self._cancel_event.is_set():
+                        return
+                    if not self._run_single_batch(index, batch_files, generated_files[index], total_batches):
+                        self.merge_failed.emit(f"Failed to process part {index + 1}", None)
+                        return
+            
+            if self._cancel_event.is_set():
                 return
             
             # Emit completion signal with the main output path (or list description)
@@ -163,85 +235,308 @@ class VideoMergerWorker(QThread):
                 self.merge_completed.emit(f"{total_batches} parts created starting with:\n{generated_files[0]}")
             else:
                 self.merge_completed.emit(self.output_path)
-                
+        
+        except MergeCancelled:
+            return # The GUI already knows; cancel() reported it
         except Exception as e:
             # Handle any unexpected errors
             error_msg = f"An error occurred during video processing:\n\n{str(e)}"
             
-            # Include traceback for debugging if needed
-            if hasattr(e, '__traceback__'):
-                error_msg += f"\n\nTechnical details:\n{traceback.format_exc()}"
+            # The GUI formats the traceback for the dialog's details pane; only str(e) is built here
+            self.merge_failed.emit(error_msg, sys.exc_info())
+    
+    def _batch_workers(self, total_batches: int) -> int:
+        """How many parts to merge at once (1 unless the user opted in)"""
+        if not self.parallel_batches or total_batches < 2 or self.video_merger.performance_level > 0:
+            return 1
+        workers = min(max(1, (os.cpu_count() or 2) // 2), total_batches)
+        if self.video_merger.use_gpu:
+            workers = min(2, workers) # Consumer GPUs cap concurrent encoder sessions
+        return workers
+    
+    def _run_single_batch(self, index: int, batch_files: List[str], output_path: str, total_batches: int,
+                          parallel_merges: int = 1) -> bool:
+        """
+        Merge one part; returns merge_videos' result (True when skipped after a cancel)
+        parallel_merges: Parts merging at the same time, which split the CPU and RAM budget
+        """
+        if self._cancel_event.is_set():
+            return True
+        batch_number = index + 1
+        
+        # Update status
+        if total_batches > 1:
+            self.status_updated.emit(f"Processing Part {batch_number}/{total_batches} ({len(batch_files)} clips)...")
+        else:
+            self.status_updated.emit("Starting video merge process...")
+        
+        # Built once per part instead of on every progress tick
+        prefix = f"[Part {batch_number}/{total_batches}] " if total_batches > 1 else ""
+        progress_callback = functools.partial(self._on_batch_progress, index, total_batches, prefix)
+        
+        # Decided once here from the cached probes (full signature: profile, time base, channel layout);
+        # merge_videos takes the verdict as is and re-encodes if the remux fails
+        codec_copy = self.video_merger.can_concat_copy(batch_files)
+        
+        # Start the video merge process for this batch
+        success = self.video_merger.merge_videos(
+            video_files=batch_files,
+            output_path=output_path,
+            progress_callback=progress_callback,
+            cancel_event=self._cancel_event,
+            codec_copy=codec_copy,
+            parallel_merges=parallel_merges
+        )
+        if success:
+            with self._progress_lock:
+                self._batch_progress[index] = 100
+        return success
+    
+    def _on_batch_progress(self, index: int, total_batches: int, prefix: str, prog: int, status: str):
+        """
+        Progress callback handed to merge_videos for one batch
+        Only changed values cross the thread boundary, so the GUI's event queue stays short
+        """
+        if self._cancel_event.is_set():
+            return
+        # Use detailed status if multiple batches
+        if prefix:
+            status = prefix + status
+        
+        with self._progress_lock:
+            # Overall progress is the mean of every part's 0-100
+            # e.g. with 2 parts, Part 1 covers 0-50% and Part 2 covers 50-100% when run in turn
+            self._batch_progress[index] = prog
+            overall_progress = int(sum(self._batch_progress) / total_batches)
             
-            self.merge_failed.emit(error_msg)
+            now = time.monotonic_ns()
+            # New percentages always go out; status-only changes at most every PROGRESS_INTERVAL_NS
+            if overall_progress == self._last_pct and (
+                    status == self._last_status or now - self._last_emit_ns < self.PROGRESS_INTERVAL_NS):
+                return
+            if overall_progress != self._last_pct:
+                self.progress_updated.emit(overall_progress)
+                self._last_pct = overall_progress
+            if status != self._last_status:
+                self.status_updated.emit(status)
+                self._last_status = status
+            self._last_emit_ns = now
     
     def cancel(self):
         """
         Cancel the current video processing operation
         """
-        self._is_cancelled = True
+        self._cancel_event.set()
         self.status_updated.emit("Cancelling video merge...")
     
     def is_cancelled(self) -> bool:
         """
         Check if the operation has been cancelled
         """
-        return self._is_cancelled
+        return self._cancel_event.is_set()
+
+
+class _Runnable(QRunnable):
+    """
+    Runs a plain callable on a QThreadPool
+    The callable reports back through signals on its own QObject
+    """
+    
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+    
+    def run(self):
+        self.fn()
 
 
-class VideoInfoWorker(QThread):
+class VideoInfoWorker(QObject):
     """
-    Worker thread for getting video file information including duration
+    Gets video file information including duration on the shared QThreadPool
+    Each probe group is its own pool task, so no thread is created per request
     """
     
     # Signals for communicating with the main thread
-    info_ready = pyqtSignal(str, dict)    # file_path, video_info
-    info_failed = pyqtSignal(str, str)    # file_path, error_message
+    infos_ready = pyqtSignal(dict, dict)  # {file_path: video_info}, {file_path: error_message}
+    finished = pyqtSignal()               # Every task is done (or was dropped after a cancel)
+    
+    PROBE_GROUP_SIZE = 32  # Files per batched ffmpeg probe (keeps command lines short)
+    EMIT_CHUNK = 16        # Results per signal - the GUI applies each chunk in one pass
+    EMIT_INTERVAL = 0.25   # ...but never sits on finished results longer than this (seconds)
     
-    def __init__(self, video_files: List[str], video_merger: RobustVideoMerger):
+    def __init__(self, video_files: List[str], video_merger: RobustVideoMerger,
+                 pool: Optional[QThreadPool] = None):
         """
         Initialize the video info worker
         """
         super().__init__()
         self.video_files = video_files
         self.video_merger = video_merger
+        self.pool = pool or QThreadPool.globalInstance()
+        self._is_cancelled = False
+        self._lock = threading.Lock() # Guards everything below; tasks finish on pool threads
+        self._queued = deque()        # Probe groups not handed to the pool yet
+        self._active = 0              # Probe groups on the pool
+        self._max_active = 1
+        self._infos, self._errors = {}, {}
+        self._last_emit = 0.0
     
-    def run(self):
+    def start(self):
         """
-        Main thread execution method
-        Gets information for each video file
+        Queue the work on the pool and return immediately
+        """
+        self.pool.start(_Runnable(self._lookup_cached))
+    
+    def cancel(self):
+        """
+        Stop probing; results not yet emitted are dropped
         """
-        for video_path in self.video_files:
+        self._is_cancelled = True
+    
+    def _lookup_cached(self):
+        """
+        First task: answer unchanged files from the metadata cache (one stat each, no spawn),
+        then queue probes for the rest
+        """
+        hits, misses = {}, []
+        for path in self.video_files:
+            if self._is_cancelled:
+                break
+            try:
+                info = self.video_merger.cached_video_info(path)
+            except OSError:
+                info = None # Let the probe report the missing file
+            if info is None:
+                misses.append(path)
+            else:
+                hits[path] = info
+        if hits and not self._is_cancelled:
+            self.infos_ready.emit(hits, {})
+        if not misses or self._is_cancelled:
+            self.finished.emit()
+            return
+        
+        if not self.video_merger.groups_probes:
+            # PyAV and ffprobe read one input per call, so fan out per file
+            jobs = [[path] for path in misses]
+        else:
+            # ffmpeg accepts many inputs per process - probe each folder in one spawn
+            jobs = self._group_by_directory(misses)
+        
+        # Probes are subprocesses, so more can wait on the pool than there are cores
+        max_active = min(16, (os.cpu_count() or 1) * 2)
+        if self.video_merger.performance_level >= 2:
+            max_active = 2 # Don't swamp low-RAM machines with probe processes
+        
+        with self._lock:
+            self._queued.extend(jobs)
+            self._max_active = max_active
+            self._last_emit = time.monotonic()
+            self._submit_queued()
+    
+    def _submit_queued(self):
+        """Hand queued groups to the pool up to the in-flight limit (caller holds the lock)"""
+        while self._queued and self._active < self._max_active:
+            group = self._queued.popleft()
+            self._active += 1
+            self.pool.start(_Runnable(functools.partial(self._run_group, group)))
+    
+    def _run_group(self, group: List[str]):
+        """Pool task: probe one group and emit results in chunks"""
+        results = [] if self._is_cancelled else self._probe_group(group)
+        
+        with self._lock:
+            self._active -= 1
+            if self._is_cancelled:
+                self._queued.clear() # Queued groups never start; running ones finish unseen
+                if self._active == 0:
+                    self.finished.emit()
+                return
+            
+            for video_path, video_info, error in results:
+                if error is None:
+                    self._infos[video_path] = video_info
+                else:
+                    self._errors[video_path] = error
+            
+            done = not self._queued and self._active == 0
+            pending = len(self._infos) + len(self._errors)
+            if pending and (done or pending >= self.EMIT_CHUNK
+                            or time.monotonic() - self._last_emit >= self.EMIT_INTERVAL):
+                self.infos_ready.emit(self._infos, self._errors)
+                self._infos, self._errors = {}, {}
+                self._last_emit = time.monotonic()
+            
+            if done:
+                self.finished.emit()
+            else:
+                self._submit_queued()
+    
+    def _group_by_directory(self, video_files: List[str]) -> List[List[str]]:
+        """Group files by parent folder, keeping each group short enough for one command line"""
+        groups = {}
+        for path in video_files:
+            groups.setdefault(os.path.dirname(path), []).append(path)
+        
+        jobs = []
+        for group in groups.values():
+            for i in range(0, len(group), self.PROBE_GROUP_SIZE):
+                jobs.append(group[i : i + self.PROBE_GROUP_SIZE])
+        return jobs
+    
+    def _probe_group(self, group: List[str]) -> list:
+        """Probe a group of files, returning (path, info, error) tuples in group order"""
+        batch_info = {}
+        if len(group) > 1:
             try:
-                # Get video information
-                video_info = self.video_merger.get_video_info(video_path)
-                self.info_ready.emit(video_path, video_info)
-                
+                batch_info = self.video_merger.get_video_info_batch(group)
+            except Exception:
+                pass # Probe individually below
+        
+        results = []
+        for video_path in group:
+            try:
+                video_info = batch_info.get(video_path) or self.video_merger.get_video_info(video_path)
+                results.append((video_path, video_info, None))
             except Exception as e:
-                # Emit error for this specific file
-                self.info_failed.emit(video_path, str(e))
+                results.append((video_path, None, str(e)))
+        return results
+
+
+class BatchPlanSignals(QObject):
+    """
+    Signals for BatchPlanJob (QRunnable is not a QObject and cannot own signals)
+    """
+    plan_ready = pyqtSignal(int, object)  # generation, list of batches
 
 
-class UpdateCheckerWorker(QThread):
+class BatchPlanJob(QRunnable):
     """
-    Worker thread for checking software updates remotely
+    Thread-pool task that runs calculate_batches for the sidebar preview
+    Works on a snapshot of the file list and durations so the GUI can keep editing
     """
-    update_available = pyqtSignal(str, str, str) # version, url, message
     
-    def __init__(self, check_url: str):
+    def __init__(self, generation: int, video_merger: RobustVideoMerger, video_files: List[str],
+                 durations: dict, max_duration: float, max_clip_count: int, standalone_threshold: float):
         super().__init__()
-        self.check_url = check_url
+        self.signals = BatchPlanSignals()
+        self.generation = generation
+        self.video_merger = video_merger
+        self.video_files = video_files
+        self.durations = durations
+        self.max_duration = max_duration
+        self.max_clip_count = max_clip_count
+        self.standalone_threshold = standalone_threshold
     
     def run(self):
         try:
-            # Use urllib to avoid external dependencies like 'requests'
-            with urllib.request.urlopen(self.check_url, timeout=10) as response:
-                if response.status == 200:
-                    data = json.loads(response.read().decode())
-                    version = data.get('version')
-                    url = data.get('download_url')
-                    message = data.get('message', '')
-                    
-                    if version and url:
-                        self.update_available.emit(version, url, message)
+            batches = self.video_merger.calculate_batches(
+                self.video_files,
+                max_duration_sec=self.max_duration,
+                max_clip_count=self.max_clip_count,
+                cached_durations=self.durations,
+                standalone_threshold_sec=self.standalone_threshold
+            )
         except Exception:
-            return  # Fail silently for placeholder URLs
+            batches = [self.video_files]
+        self.signals.plan_ready.emit(self.generation, batches)